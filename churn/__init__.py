@@ -0,0 +1 @@
+"""Pipeline inferensi churn yang dapat dipakai ulang di luar Streamlit."""
@@ -0,0 +1,114 @@
+"""SVM aproksimasi: peta fitur kernel RBF eksplisit + classifier linear.
+
+SVC RBF biasa menyimpan ribuan support vector dari data hasil SMOTE, sehingga
+ukuran file dan biaya prediksinya ikut membesar. Di sini kernel RBF yang sama
+(gamma diambil dari SVC terlatih) diaproksimasi dengan Nyström atau Random
+Fourier Features, lalu dilatih Logistic Regression di atasnya - probabilitas
+langsung keluar tanpa cross-validation Platt scaling.
+
+Contoh:
+    python -m churn.approx_svm --method nystroem --n-components 300
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.kernel_approximation import Nystroem, RBFSampler
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import f1_score
+from sklearn.pipeline import Pipeline
+
+from churn import pipeline, train
+from churn.fused import fuse, fused_path, save_fused
+
+APPROX_NAME = 'support_vector_machine_approx'
+REPORT_FILE = 'support_vector_machine_approx_report.json'
+
+
+def build_approx_svm(gamma, method='nystroem', n_components=300, random_state=42):
+    if method == 'nystroem':
+        feature_map = Nystroem(kernel='rbf', gamma=gamma, n_components=n_components, random_state=random_state)
+    else:
+        feature_map = RBFSampler(gamma=gamma, n_components=n_components, random_state=random_state)
+    return Pipeline([
+        ('feature_map', feature_map),
+        ('clf', LogisticRegression(max_iter=2000, random_state=random_state)),
+    ])
+
+
+def _latency(fused, X_raw, repeat=200):
+    """(p50 µs per baris untuk 1 baris, µs per baris untuk satu batch penuh)."""
+    single = []
+    for i in range(repeat):
+        row = X_raw[i % len(X_raw):i % len(X_raw) + 1]
+        start = time.perf_counter()
+        fused.predict_proba(row)
+        single.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    fused.predict_proba(X_raw)
+    batch = time.perf_counter() - start
+    return float(np.median(single) * 1e6), float(batch / len(X_raw) * 1e6)
+
+
+def compare(svc, approx, scaler, model_columns, X_raw, y_test, base_path):
+    # X_test belum di-scale, sehingga latensi mencakup scaling seperti di aplikasi
+    report = {}
+    for name, estimator in (('support_vector_machine', svc), (APPROX_NAME, approx)):
+        fused = fuse(name, estimator, scaler, model_columns)
+        label = fused.predict(X_raw)
+        p50_single, per_row_batch = _latency(fused, X_raw)
+        report[name] = {
+            'f1_churn': round(float(f1_score(y_test, label)), 4),
+            'latency_single_p50_us': round(p50_single, 1),
+            'latency_batch_us_per_row': round(per_row_batch, 2),
+        }
+    report['support_vector_machine']['file_kb'] = round(os.path.getsize(
+        os.path.join(base_path, pipeline.MODEL_FILES['support_vector_machine'])) / 1024, 1)
+    report[APPROX_NAME]['file_kb'] = round(os.path.getsize(
+        os.path.join(base_path, pipeline.MODEL_FILES[APPROX_NAME])) / 1024, 1)
+    report[APPROX_NAME]['fused_kb'] = round(os.path.getsize(fused_path(APPROX_NAME, base_path)) / 1024, 1)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latih SVM aproksimasi (kernel map + model linear) dan bandingkan dengan SVC.")
+    parser.add_argument('--data', default=os.path.join('data', 'Churn.csv'))
+    parser.add_argument('--models-dir', default=pipeline.BASE_PATH)
+    parser.add_argument('--method', choices=['nystroem', 'rff'], default='nystroem')
+    parser.add_argument('--n-components', type=int, default=300)
+    parser.add_argument('--random-state', type=int, default=42)
+    parser.add_argument('--cache-dir', default=train.CACHE_DIR)
+    args = parser.parse_args(argv)
+
+    svc = pipeline.load_model('support_vector_machine', args.models_dir)
+    data = train.load_prepared(args.data, random_state=args.random_state, cache_dir=args.cache_dir)
+    scaler, model_columns = data['scaler'], data['model_columns']
+
+    approx = build_approx_svm(svc._gamma, args.method, args.n_components, args.random_state)
+    start = time.perf_counter()
+    approx.fit(data['X_resampled'], data['y_resampled'])
+    print(f"SVM aproksimasi ({args.method}, {args.n_components} komponen) dilatih dalam {time.perf_counter() - start:.2f} s")
+
+    model_path = os.path.join(args.models_dir, pipeline.MODEL_FILES[APPROX_NAME])
+    joblib.dump(approx, model_path)
+    # Artefak gabungan langsung dibuat agar aplikasi memakai jalur kernel-linear yang ringkas
+    save_fused(fuse(APPROX_NAME, approx, scaler, model_columns), args.models_dir)
+
+    report = compare(svc, approx, scaler, model_columns, data['X_test'], data['y_test'], args.models_dir)
+    report['config'] = {'method': args.method, 'n_components': args.n_components, 'gamma': float(svc._gamma)}
+    report_path = os.path.join(args.models_dir, REPORT_FILE)
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print(pd.DataFrame({k: v for k, v in report.items() if k != 'config'}).T.to_string())
+    print(f"Model -> {model_path}\nArtefak gabungan -> {fused_path(APPROX_NAME, args.models_dir)}\nLaporan -> {report_path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""Benchmark jalur inferensi dan pra-pemrosesan terhadap artefak asli.
+
+Mengukur dengan `saved_models/` dan `data/Churn.csv`:
+- pra-pemrosesan record mentah: jalur lama (replace + get_dummies + reindex)
+  dan `EncoderPlan` yang dipakai aplikasi,
+- `scaler.transform`,
+- `predict_proba` setiap model pada batch 1, 100, 10k, dan 1M baris (baris
+  diambil acak dari dataset),
+- pemuatan model dingin (proses Python baru) dan agregasi EDA.
+
+Hasil ditulis sebagai JSON (beserta versi pustaka) agar bisa dibandingkan
+antar-run; `--compare` menampilkan rasio terhadap hasil sebelumnya.
+
+Contoh:
+    python -m churn.bench --output bench.json
+    python -m churn.bench --sizes 1 100 10000 --compare bench.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from churn import dataset, eda, pipeline
+
+DEFAULT_SIZES = [1, 100, 10_000, 1_000_000]
+MIN_SECONDS = 0.2
+MAX_SECONDS = 30.0
+
+
+# --- Pengukuran ---
+def measure(fn, rows, min_seconds=MIN_SECONDS, min_repeat=3):
+    """Median detik per panggilan `fn()` (diulang hingga `min_seconds`), beserta throughput baris/detik."""
+    samples = []
+    total = 0.0
+    while len(samples) < min_repeat or total < min_seconds:
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        samples.append(elapsed)
+        total += elapsed
+    median = float(np.median(samples))
+    return {
+        'rows': rows,
+        'repeat': len(samples),
+        'median_ms': round(median * 1e3, 4),
+        'min_ms': round(min(samples) * 1e3, 4),
+        'rows_per_s': round(rows / median, 1) if median else None,
+    }
+
+
+def _legacy_preprocess(df, model_columns):
+    # Jalur pra-pemrosesan awal di halaman prediksi (sebelum EncoderPlan), dipertahankan sebagai pembanding
+    input_df = df.drop(columns=[c for c in ('customerID', 'gender', 'PhoneService', 'Churn') if c in df.columns])
+    input_df['TotalCharges'] = pd.to_numeric(input_df['TotalCharges'], errors='coerce').fillna(0.0)
+    kolom_diubah = ["OnlineSecurity", "OnlineBackup", "DeviceProtection", "TechSupport", "StreamingTV", "StreamingMovies"]
+    for kolom in kolom_diubah:
+        input_df[kolom] = input_df[kolom].replace("No internet service", "No")
+    input_df["MultipleLines"] = input_df["MultipleLines"].replace("No phone service", "No")
+    input_encoded = pd.get_dummies(input_df, drop_first=True)
+    return input_encoded.reindex(columns=model_columns, fill_value=0)
+
+
+def synthesize(df, n, random_state=0):
+    """`n` baris data mentah yang diambil acak (dengan pengembalian) dari dataset."""
+    idx = np.random.default_rng(random_state).integers(0, len(df), size=n)
+    return df.iloc[idx].reset_index(drop=True)
+
+
+def _skip(per_row_s, rows, max_seconds):
+    # Perkiraan dari ukuran batch sebelumnya; batch yang akan terlalu lama dilewati
+    return per_row_s is not None and per_row_s * rows * 3 > max_seconds
+
+
+# --- Skenario Benchmark ---
+def bench_preprocessing(df, model_columns, sizes, max_seconds):
+    scaler, _ = pipeline.load_preprocessors()
+    hasil = {'legacy_get_dummies': {}, 'encoder_plan': {}, 'scaler_transform': {}}
+    per_row = dict.fromkeys(hasil)
+    for n in sizes:
+        data = synthesize(df, n)
+        kasus = {
+            'legacy_get_dummies': lambda: _legacy_preprocess(data, model_columns),
+            'encoder_plan': lambda: pipeline.preprocess(data, model_columns),
+        }
+        encoded = pd.DataFrame(pipeline.preprocess(data, model_columns), columns=model_columns)
+        kasus['scaler_transform'] = lambda: scaler.transform(encoded)
+        for nama, fn in kasus.items():
+            if _skip(per_row[nama], n, max_seconds):
+                hasil[nama][str(n)] = {'rows': n, 'skipped': True}
+                continue
+            hasil[nama][str(n)] = measure(fn, n)
+            per_row[nama] = hasil[nama][str(n)]['median_ms'] / 1e3 / n
+    return hasil
+
+
+def bench_models(df, names, sizes, max_seconds):
+    hasil = {}
+    for name in names:
+        model = pipeline.load_fused(name)
+        hasil[name] = {}
+        per_row = None
+        for n in sizes:
+            if _skip(per_row, n, max_seconds):
+                hasil[name][str(n)] = {'rows': n, 'skipped': True}
+                continue
+            X = pipeline.preprocess(synthesize(df, n), model.model_columns)
+            hasil[name][str(n)] = measure(lambda: model.predict_proba(X), n)
+            per_row = hasil[name][str(n)]['median_ms'] / 1e3 / n
+    return hasil
+
+
+def bench_cold_load(names, repeat=3):
+    """Waktu memuat model di proses Python baru (termasuk import), seperti start pertama aplikasi."""
+    hasil = {}
+    for name in names:
+        kode = (
+            "import time; start = time.perf_counter(); from churn import pipeline; "
+            f"pipeline.load_fused({name!r}); print(time.perf_counter() - start)"
+        )
+        samples = []
+        for _ in range(repeat):
+            keluaran = subprocess.run([sys.executable, '-W', 'ignore', '-c', kode], capture_output=True, text=True,
+                                      check=True, cwd=os.getcwd())
+            samples.append(float(keluaran.stdout.strip().splitlines()[-1]))
+        hasil[name] = {'median_ms': round(float(np.median(samples)) * 1e3, 2), 'repeat': repeat}
+    return hasil
+
+
+def bench_eda(data_path):
+    df = dataset.load_dataset(data_path)
+    return {
+        'load_dataset_cached': measure(lambda: dataset.load_dataset(data_path), len(df)),
+        'compute_aggregates': measure(lambda: eda.compute_aggregates(df), len(df)),
+        'streaming_aggregates': measure(lambda: list(eda.iter_aggregates(data_path, 2_000))[-1], len(df)),
+    }
+
+
+def environment():
+    versi = {}
+    for modul in ('numpy', 'pandas', 'sklearn', 'xgboost', 'streamlit'):
+        try:
+            versi[modul] = __import__(modul).__version__
+        except ImportError:
+            versi[modul] = None
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ''
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'commit': commit or None,
+        'versions': versi,
+    }
+
+
+def run(data_path=dataset.DATA_PATH, sizes=DEFAULT_SIZES, names=None, max_seconds=MAX_SECONDS, cold=True):
+    df = pd.read_csv(data_path)
+    names = names or pipeline.available_models()
+    _, model_columns = pipeline.load_preprocessors()
+    hasil = {
+        'generated_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'environment': environment(),
+        'sizes': sizes,
+        'preprocessing': bench_preprocessing(df, model_columns, sizes, max_seconds),
+        'predict_proba': bench_models(df, names, sizes, max_seconds),
+        'eda': bench_eda(data_path),
+    }
+    if cold:
+        hasil['cold_load'] = bench_cold_load(names)
+    return hasil
+
+
+# --- Laporan ---
+def _flatten(hasil):
+    # {'predict_proba/xgboost/100': median_ms, ...} untuk dibandingkan antar-run
+    rata = {}
+    for bagian in ('preprocessing', 'predict_proba', 'eda', 'cold_load'):
+        for nama, isi in hasil.get(bagian, {}).items():
+            if 'median_ms' in isi:
+                rata[f"{bagian}/{nama}"] = isi['median_ms']
+                continue
+            for ukuran, m in isi.items():
+                if isinstance(m, dict) and 'median_ms' in m:
+                    rata[f"{bagian}/{nama}/{ukuran}"] = m['median_ms']
+    return rata
+
+
+def report(hasil, pembanding=None):
+    sekarang = _flatten(hasil)
+    lama = _flatten(pembanding) if pembanding else {}
+    lebar = max(len(k) for k in sekarang)
+    for key, ms in sekarang.items():
+        baris = f"{key:<{lebar}}  {ms:>12.4f} ms"
+        if key in lama and lama[key]:
+            rasio = ms / lama[key]
+            baris += f"  x{rasio:5.2f} {'(lebih lambat)' if rasio > 1.2 else '(lebih cepat)' if rasio < 0.8 else ''}"
+        print(baris)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark pra-pemrosesan dan inferensi model churn.")
+    parser.add_argument('--data', default=dataset.DATA_PATH)
+    parser.add_argument('--model', choices=sorted(pipeline.MODEL_FILES), action='append',
+                        help="Model yang diukur (bisa diulang). Default: semua model yang tersedia.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="Ukuran batch")
+    parser.add_argument('--max-seconds', type=float, default=MAX_SECONDS,
+                        help="Lewati batch yang diperkirakan lebih lama dari ini (mis. SVC pada 1M baris)")
+    parser.add_argument('--no-cold', action='store_true', help="Jangan ukur pemuatan dingin di proses baru")
+    parser.add_argument('--output', default=None, help="File JSON hasil (default: .cache/bench/bench-<waktu>.json)")
+    parser.add_argument('--compare', default=None, help="File JSON hasil sebelumnya sebagai pembanding")
+    args = parser.parse_args(argv)
+
+    hasil = run(args.data, args.sizes, args.model, args.max_seconds, not args.no_cold)
+
+    output = args.output or os.path.join('.cache', 'bench', f"bench-{datetime.datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(hasil, f, indent=2)
+
+    pembanding = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            pembanding = json.load(f)
+    report(hasil, pembanding)
+    print(f"Hasil -> {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""Random Forest ringkas: pohon diratakan menjadi array kontigu tanpa objek sklearn.
+
+Pickle `RandomForestClassifier` menyimpan setiap node sebagai struct 64-byte
+(plus array `value` per kelas) dan prediksinya memanggil 100 pohon satu per
+satu. Di sini setiap pohon ditulis ulang dalam urutan pre-order sehingga anak
+kiri selalu node berikutnya, dan seluruh forest menjadi lima array:
+
+    feature    int8 (int16 jika fitur > 127)   indeks fitur yang diuji
+    threshold  float32                          ambang (NaN = daun)
+    right      int32                            indeks anak kanan (daun: dirinya sendiri)
+    value      float32                          P(churn) di node tersebut
+    roots      int32                            indeks akar setiap pohon
+
+Tanpa pruning hasilnya identik dengan sklearn (ambang dibulatkan ke bawah ke
+float32, sama seperti fitur yang dibandingkan sklearn). Traversal NumPy-nya
+unggul untuk input kecil (satu pelanggan: ±0,5 ms vs ±14 ms), tetapi pada batch
+besar per baris ±2x lebih lambat dari sklearn. Artefak hanya berisi array
+ringkas; skoring batch bisa memuat pickle sklearn secara terpisah untuk batch
+besar (`churn.score --sklearn-forest`). Pruning opsional
+(`--max-depth`, `--min-samples`, `--n-trees`) memperkecil artefak dan
+mempercepat traversal; laporan fidelitas mencatat kesesuaian label dan
+selisih probabilitas terhadap forest asli pada split uji.
+
+Contoh:
+    python -m churn.compact_forest
+    python -m churn.compact_forest --min-samples 5 --n-trees 50
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from churn import pipeline, portable, train
+from churn.fused import fuse
+
+FOREST_NAME = 'random_forest'
+REPORT_FILE = 'random_forest_compact_report.json'
+
+
+# --- Perataan Pohon ---
+def _floor_float32(values):
+    # float32 terbesar yang <= nilai float64, agar `x32 <= t32` sama persis dengan `x32 <= t64` di sklearn
+    hasil = values.astype(np.float32)
+    lebih = hasil.astype(np.float64) > values
+    hasil[lebih] = np.nextafter(hasil[lebih], np.float32(-np.inf))
+    return hasil
+
+
+def _flatten_tree(tree, offset, max_depth=None, min_samples=0):
+    left, right = tree.children_left, tree.children_right
+    order = []
+    stack = [(0, 0)]
+    while stack:
+        node, depth = stack.pop()
+        order.append(node)
+        dipecah = left[node] >= 0 and (max_depth is None or depth < max_depth) \
+            and tree.n_node_samples[node] >= min_samples
+        if dipecah:
+            stack.append((right[node], depth + 1))
+            stack.append((left[node], depth + 1))
+    order = np.asarray(order)
+
+    posisi = np.full(tree.node_count, -1)
+    posisi[order] = np.arange(len(order))
+    # Node yang anaknya dipangkas ikut menjadi daun dengan distribusi kelasnya sendiri
+    daun = (left[order] < 0) | (posisi[np.maximum(left[order], 0)] < 0)
+    value = tree.value[order, 0, :]
+    return {
+        'feature': np.where(daun, 0, tree.feature[order]),
+        'threshold': np.where(daun, np.nan, tree.threshold[order]),
+        'right': np.where(daun, np.arange(len(order)), posisi[np.maximum(right[order], 0)]) + offset,
+        'value': value[:, 1] / value.sum(axis=1),
+    }
+
+
+def flatten_forest(forest, max_depth=None, min_samples=0, n_trees=None):
+    """Array forest untuk `FusedModel` kind `forest` (lihat docstring modul).
+
+    `max_depth`/`min_samples` mengubah node yang lebih dalam atau berisi lebih sedikit sampel latih menjadi
+    daun; `n_trees` hanya memakai pohon pertama. Tanpa ketiganya hasilnya identik dengan forest asli.
+    """
+    bagian, roots = [], []
+    offset = 0
+    for estimator in forest.estimators_[:n_trees]:
+        pohon = _flatten_tree(estimator.tree_, offset, max_depth, min_samples)
+        bagian.append(pohon)
+        roots.append(offset)
+        offset += len(pohon['value'])
+
+    n_features = forest.n_features_in_
+    return {
+        'feature': np.concatenate([p['feature'] for p in bagian]).astype(np.int8 if n_features <= 127 else np.int16),
+        'threshold': _floor_float32(np.concatenate([p['threshold'] for p in bagian])),
+        'right': np.concatenate([p['right'] for p in bagian]).astype(np.int32),
+        'value': np.concatenate([p['value'] for p in bagian]).astype(np.float32),
+        'roots': np.asarray(roots, dtype=np.int32),
+    }
+
+
+def forest_nbytes(forest):
+    return sum(value.nbytes for value in forest.values())
+
+
+# --- Laporan Fidelitas ---
+def _latency(predict, X_raw, repeat=200):
+    """(p50 µs untuk 1 baris, µs per baris untuk satu batch penuh)."""
+    single = []
+    for i in range(repeat):
+        row = X_raw[i % len(X_raw):i % len(X_raw) + 1]
+        start = time.perf_counter()
+        predict(row)
+        single.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    predict(X_raw)
+    batch = time.perf_counter() - start
+    return float(np.median(single) * 1e6), float(batch / len(X_raw) * 1e6)
+
+
+def fidelity_report(forest, compact, scaler, model_columns, X_raw, y_test):
+    """Bandingkan forest sklearn dengan versi ringkas pada split uji (X_raw belum di-scale)."""
+    from sklearn.metrics import accuracy_score, f1_score
+
+    def sklearn_proba(X):
+        return forest.predict_proba(scaler.transform(pd.DataFrame(X, columns=model_columns)))[:, 1]
+
+    def compact_proba(X):
+        return compact.predict_proba(X)[:, 1]
+
+    report = {}
+    proba = {}
+    for key, predict in (('sklearn', sklearn_proba), ('compact', compact_proba)):
+        proba[key] = predict(X_raw)
+        label = (proba[key] >= 0.5).astype(int)
+        p50_single, per_row_batch = _latency(predict, X_raw)
+        report[key] = {
+            'f1_churn': round(float(f1_score(y_test, label)), 4),
+            'accuracy': round(float(accuracy_score(y_test, label)), 4),
+            'latency_single_p50_us': round(p50_single, 1),
+            'latency_batch_us_per_row': round(per_row_batch, 2),
+        }
+    report['sklearn']['nodes'] = int(sum(e.tree_.node_count for e in forest.estimators_))
+    report['compact']['nodes'] = len(compact.forest['value'])
+    report['compact']['trees'] = len(compact.forest['roots'])
+    report['compact']['array_kb'] = round(forest_nbytes(compact.forest) / 1024, 1)
+
+    selisih = np.abs(proba['compact'] - proba['sklearn'])
+    report['fidelity'] = {
+        'label_agreement': round(float(((proba['compact'] >= 0.5) == (proba['sklearn'] >= 0.5)).mean()), 4),
+        'max_abs_diff': float(selisih.max()),
+        'mean_abs_diff': float(selisih.mean()),
+    }
+    return report
+
+
+# --- CLI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ratakan Random Forest ke array ringkas dan ekspor ke format portabel.")
+    parser.add_argument('--data', default=os.path.join('data', 'Churn.csv'))
+    parser.add_argument('--models-dir', default=pipeline.BASE_PATH)
+    parser.add_argument('--max-depth', type=int, default=None, help="Pangkas node di bawah kedalaman ini")
+    parser.add_argument('--min-samples', type=int, default=0, help="Jangan pecah node dengan sampel latih lebih sedikit")
+    parser.add_argument('--n-trees', type=int, default=None, help="Hanya pakai N pohon pertama")
+    parser.add_argument('--random-state', type=int, default=42)
+    parser.add_argument('--cache-dir', default=train.CACHE_DIR)
+    args = parser.parse_args(argv)
+
+    data = train.load_prepared(args.data, random_state=args.random_state, cache_dir=args.cache_dir)
+    scaler, model_columns = data['scaler'], data['model_columns']
+    try:
+        forest = pipeline.load_model(FOREST_NAME, args.models_dir)
+    except FileNotFoundError:
+        # Pickle RF tidak disertakan di repo; latih ulang dengan parameter notebook
+        start = time.perf_counter()
+        forest = train.build_model(FOREST_NAME, args.random_state).fit(data['X_resampled'], data['y_resampled'])
+        # Disimpan agar laporan fidelitas tetap merujuk ke forest yang ada (dan bisa diekspor ulang tanpa pruning)
+        path = pipeline.save_model(FOREST_NAME, forest, args.models_dir)
+        print(f"{pipeline.MODEL_FILES[FOREST_NAME]} tidak ditemukan, forest dilatih ulang dalam "
+              f"{time.perf_counter() - start:.2f} s -> {path}")
+
+    compact = fuse(FOREST_NAME, forest, scaler, model_columns)
+    compact.forest = flatten_forest(forest, args.max_depth, args.min_samples, args.n_trees)
+    manifest_path = portable.export_portable([compact], args.models_dir)
+
+    report = fidelity_report(forest, compact, scaler, model_columns, data['X_test'], data['y_test'])
+    report['config'] = {'max_depth': args.max_depth, 'min_samples': args.min_samples, 'n_trees': args.n_trees}
+    report_path = os.path.join(args.models_dir, REPORT_FILE)
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print(pd.DataFrame({k: report[k] for k in ('sklearn', 'compact')}).T.to_string())
+    print(', '.join(f"{k}={v:.4g}" for k, v in report['fidelity'].items()))
+    print(f"Manifest -> {manifest_path}\nLaporan -> {report_path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""Menilai input yang sama dengan semua model sekaligus.
+
+Setiap model dijalankan di thread terpisah dari satu pool bersama. XGBoost,
+libsvm/sklearn, dan perkalian matriks NumPy melepas GIL selama inferensi,
+sehingga total waktu mendekati model paling lambat, bukan jumlah semuanya.
+Matriks fitur di-encode sekali per set `model_columns` lalu dipakai bersama.
+Waktu per model diukur pada model aslinya, bukan pada pembungkus cache
+prediksi, sehingga yang dibandingkan adalah waktu inferensi.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from churn import pipeline, prediction_cache, timing
+from churn.fused import DEFAULT_THRESHOLD
+
+ENSEMBLE_NAME = 'ensemble'
+
+# Satu pool per proses (dipakai bersama oleh semua sesi); satu thread per model
+_executor = ThreadPoolExecutor(max_workers=len(pipeline.MODEL_FILES), thread_name_prefix='churn-compare')
+
+
+def _timed_proba(model, X, trace=None):
+    # Trace bersifat per thread; span worker dicatat ke trace thread pemanggil
+    with timing.default_metrics.use_trace(trace):
+        start = time.perf_counter()
+        proba = model.predict_proba(X)[:, 1]
+        return proba, time.perf_counter() - start
+
+
+def _encode_once(encode, models):
+    # Model dengan model_columns yang sama memakai matriks fitur yang sama
+    matrices = {}
+    for model in models.values():
+        key = tuple(model.model_columns)
+        if key not in matrices:
+            matrices[key] = encode(model.model_columns)
+    return {name: matrices[tuple(model.model_columns)] for name, model in models.items()}
+
+
+def score_all(encode, models, ensemble=True, use_cache=False):
+    """Probabilitas churn dari setiap model, dijalankan paralel.
+
+    `encode(model_columns)` menghasilkan matriks fitur (mis. `pipeline.preprocess` untuk DataFrame).
+    Mengembalikan (dict nama -> probabilitas churn, dict nama -> detik per model, detik total). Dengan
+    `ensemble=True` ditambahkan entri `'ensemble'`: rata-rata probabilitas semua model (soft voting).
+    Tanpa `use_cache`, model `CachedModel` dinilai lewat model aslinya agar waktunya adalah waktu inferensi,
+    bukan waktu pencarian cache.
+    """
+    if not use_cache:
+        models = {name: prediction_cache.unwrap(model) for name, model in models.items()}
+    start = time.perf_counter()
+    matrices = _encode_once(encode, models)
+    trace = timing.default_metrics.current_trace()
+    futures = {name: _executor.submit(_timed_proba, model, matrices[name], trace) for name, model in models.items()}
+    probas, timings = {}, {}
+    for name, future in futures.items():
+        probas[name], timings[name] = future.result()
+    wall = time.perf_counter() - start
+
+    if ensemble and len(probas) > 1:
+        probas[ENSEMBLE_NAME] = np.mean(list(probas.values()), axis=0)
+    return probas, timings, wall
+
+
+def score_frame_all(df, models, threshold=DEFAULT_THRESHOLD, ensemble=True):
+    """Versi `pipeline.score_frame` untuk semua model: kolom Prob_Churn_<model> dan Prediksi_<model>."""
+    # Waktu per model tidak dipakai di sini, jadi deduplikasi baris oleh cache tetap dimanfaatkan
+    probas, _, _ = score_all(lambda columns: pipeline.preprocess(df, columns), models, ensemble, use_cache=True)
+    hasil = pd.DataFrame({'customerID': df['customerID'] if 'customerID' in df.columns else df.index})
+    for name, proba in probas.items():
+        hasil[f'Prediksi_{name}'] = np.where(proba >= threshold, 'CHURN', 'TIDAK CHURN')
+        hasil[f'Prob_Churn_{name}'] = proba.round(4)
+    return hasil
@@ -0,0 +1,123 @@
+"""Pemuatan dataset churn dengan skema eksplisit dan cache kolumnar.
+
+`pd.read_csv` biasa menghasilkan kolom object/int64 dan `TotalCharges` masih
+berupa string. Di sini setiap kolom langsung diberi tipe yang hemat memori
+(category, int8/int16, float32) dan `TotalCharges` sudah dikonversi ke angka
+(nilai kosong menjadi NaN). CSV dikonversi sekali ke Parquet (per chunk,
+sehingga file yang lebih besar dari RAM pun bisa dikonversi); pemuatan
+berikutnya membaca Parquet selama file sumber tidak berubah.
+"""
+import hashlib
+import os
+
+import pandas as pd
+
+DATA_PATH = os.path.join('data', 'Churn.csv')
+CACHE_DIR = os.path.join('.cache', 'dataset')
+SCHEMA_VERSION = 1
+CONVERT_CHUNKSIZE = 500_000
+
+KOLOM_KATEGORI = [
+    'gender', 'Partner', 'Dependents', 'PhoneService', 'MultipleLines', 'InternetService',
+    'OnlineSecurity', 'OnlineBackup', 'DeviceProtection', 'TechSupport', 'StreamingTV',
+    'StreamingMovies', 'Contract', 'PaperlessBilling', 'PaymentMethod', 'Churn'
+]
+
+# Tipe yang dipakai saat membaca CSV; TotalCharges dibaca sebagai string lalu dikoersi
+CSV_DTYPES = {
+    'customerID': 'string',
+    'SeniorCitizen': 'int8',
+    'tenure': 'int16',
+    'MonthlyCharges': 'float32',
+    'TotalCharges': 'string',
+    **{kolom: 'category' for kolom in KOLOM_KATEGORI},
+}
+
+
+def coerce(df, float_dtype='float32'):
+    """Lengkapi tipe setelah `read_csv`: TotalCharges kosong/non-angka menjadi NaN."""
+    if 'TotalCharges' in df.columns:
+        df['TotalCharges'] = pd.to_numeric(df['TotalCharges'], errors='coerce').astype(float_dtype)
+    return df
+
+
+def read_csv_typed(path, chunksize=None, float_dtype='float32', **kwargs):
+    """`pd.read_csv` dengan skema churn; dengan `chunksize` menghasilkan iterator DataFrame bertipe.
+
+    `float_dtype='float64'` mempertahankan nilai biaya persis seperti di CSV (dipakai saat pelatihan).
+    """
+    kwargs.setdefault('dtype', {**CSV_DTYPES, 'MonthlyCharges': float_dtype})
+    if chunksize is None:
+        return coerce(pd.read_csv(path, **kwargs), float_dtype)
+    return (coerce(chunk, float_dtype) for chunk in pd.read_csv(path, chunksize=chunksize, **kwargs))
+
+
+def source_key(path):
+    """Hash identitas file sumber. Sumber dianggap sama selama path, ukuran, dan waktu modifikasinya sama
+    (tanpa membaca isi file, sehingga tetap murah untuk ekstrak berukuran puluhan GB)."""
+    st = os.stat(path)
+    key = f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}|{SCHEMA_VERSION}"
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def _cache_path(path, cache_dir, ext):
+    nama = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{nama}-{source_key(path)}.{ext}")
+
+
+def _arrow_schema(pa, columns):
+    fields = []
+    for kolom in columns:
+        dtype = CSV_DTYPES.get(kolom, 'string')
+        if dtype == 'category':
+            tipe = pa.dictionary(pa.int32(), pa.string())
+        elif kolom == 'TotalCharges':
+            tipe = pa.float32()
+        else:
+            tipe = {'string': pa.string(), 'int8': pa.int8(), 'int16': pa.int16(), 'float32': pa.float32()}[dtype]
+        fields.append(pa.field(kolom, tipe))
+    return pa.schema(fields)
+
+
+def _convert_parquet(path, target, chunksize):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    tmp = f"{target}.tmp"
+    writer = None
+    try:
+        for chunk in read_csv_typed(path, chunksize=chunksize):
+            if writer is None:
+                schema = _arrow_schema(pa, chunk.columns)
+                writer = pq.ParquetWriter(tmp, schema)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(tmp, target)
+
+
+def load_dataset(path=DATA_PATH, columns=None, cache_dir=CACHE_DIR, chunksize=CONVERT_CHUNKSIZE):
+    """Muat dataset bertipe; konversi ke Parquet di `cache_dir` pada pemuatan pertama.
+
+    Tanpa pyarrow, cache disimpan sebagai pickle pandas (tipe kolom tetap terjaga).
+    `cache_dir=None` membaca CSV langsung tanpa cache.
+    """
+    if cache_dir is None:
+        df = read_csv_typed(path)
+        return df[columns] if columns is not None else df
+
+    os.makedirs(cache_dir, exist_ok=True)
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        target = _cache_path(path, cache_dir, 'pkl')
+        if not os.path.exists(target):
+            read_csv_typed(path).to_pickle(target)
+        df = pd.read_pickle(target)
+        return df[columns] if columns is not None else df
+
+    target = _cache_path(path, cache_dir, 'parquet')
+    if not os.path.exists(target):
+        _convert_parquet(path, target, chunksize)
+    return pd.read_parquet(target, columns=columns)
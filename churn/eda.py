@@ -0,0 +1,343 @@
+"""Agregat EDA untuk halaman "Gambaran Dataset".
+
+Halaman dataset tidak lagi menghitung `value_counts`, `crosstab`, dan KDE atas
+seluruh baris pada setiap rerun. Semua angka dan grafik diturunkan dari agregat
+kecil: jumlah churn per level kategori dan per pasangan fitur kunci, serta
+histogram ber-bin tetap untuk fitur numerik. Agregat dihitung sekali dengan
+`np.bincount` atas kode kategori lalu disimpan sebagai JSON berdasarkan hash
+dataset, sehingga biaya render tidak bergantung pada jumlah baris.
+
+File besar (di atas `STREAM_THRESHOLD_BYTES`) tidak pernah dimuat utuh: CSV
+dibaca per chunk, setiap chunk diagregasi lalu dibuang, dan agregatnya
+digabung berdasarkan nama level. Semua agregat (termasuk histogram ber-tepi
+tetap yang sekaligus menjadi sketsa kuantil) bisa dijumlahkan, sehingga memori
+tetap datar berapa pun ukuran file dan hasil sementara bisa ditampilkan
+setiap kali satu chunk selesai.
+
+Contoh:
+    python -m churn.eda --data data/Churn.csv
+    python -m churn.eda --data ekstrak_bulanan.csv --chunksize 500000
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from churn import dataset
+
+CACHE_DIR = os.path.join('.cache', 'eda')
+AGGREGATE_VERSION = 1
+PREVIEW_ROWS = 5
+STREAM_THRESHOLD_BYTES = 256 * 2 ** 20
+STREAM_CHUNKSIZE = 500_000
+
+FITUR_KUNCI = ['Contract', 'InternetService', 'PaymentMethod']
+
+# Bin halus dengan tepi tetap (awal, lebar, jumlah bin); nilai di luar rentang masuk bin ujung.
+# Tepi yang tetap membuat histogram dari file/chunk berbeda bisa langsung dijumlahkan.
+HIST_BINS = {
+    'tenure': (-0.5, 1.0, 121),
+    'MonthlyCharges': (0.0, 0.5, 400),
+    'TotalCharges': (0.0, 25.0, 800),
+}
+
+
+# --- Perhitungan Agregat ---
+def _tally(codes, churn, n_levels, n_churn):
+    # Matriks (level x status churn); kode -1 (NaN) di salah satu sisi tidak dihitung
+    valid = (codes >= 0) & (churn >= 0)
+    idx = codes[valid].astype(np.int64) * n_churn + churn[valid]
+    return np.bincount(idx, minlength=n_levels * n_churn).reshape(n_levels, n_churn)
+
+
+def _bin_index(values, start, width, n_bins):
+    idx = np.floor((values - start) / width)
+    return np.clip(idx, 0, n_bins - 1).astype(np.int64)
+
+
+def compute_aggregates(df):
+    """Agregat EDA dari DataFrame bertipe (`dataset.load_dataset`)."""
+    churn_levels = list(df['Churn'].cat.categories)
+    churn = df['Churn'].cat.codes.to_numpy().astype(np.int64)
+    n_churn = len(churn_levels)
+
+    categorical = {}
+    codes = {}
+    for kolom in dataset.KOLOM_KATEGORI:
+        if kolom == 'Churn' or kolom not in df.columns:
+            continue
+        levels = list(df[kolom].cat.categories)
+        codes[kolom] = df[kolom].cat.codes.to_numpy().astype(np.int64)
+        categorical[kolom] = {
+            'levels': levels,
+            'counts': _tally(codes[kolom], churn, len(levels), n_churn).tolist(),
+        }
+
+    pairs = {}
+    for a, b in itertools.combinations(FITUR_KUNCI, 2):
+        n_b = len(categorical[b]['levels'])
+        # Kode gabungan a*n_b + b; NaN di salah satu fitur tetap bernilai negatif
+        gabungan = np.where((codes[a] >= 0) & (codes[b] >= 0), codes[a] * n_b + codes[b], -1)
+        counts = _tally(gabungan, churn, len(categorical[a]['levels']) * n_b, n_churn)
+        pairs[f"{a}|{b}"] = counts.reshape(len(categorical[a]['levels']), n_b, n_churn).tolist()
+
+    histograms = {}
+    for kolom, (start, width, n_bins) in HIST_BINS.items():
+        values = df[kolom].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values) & (churn >= 0)
+        idx = _bin_index(values[valid], start, width, n_bins) * n_churn + churn[valid]
+        histograms[kolom] = {
+            'start': start,
+            'width': width,
+            'counts': np.bincount(idx, minlength=n_bins * n_churn).reshape(n_bins, n_churn).tolist(),
+            'min': float(values[valid].min()) if valid.any() else None,
+            'max': float(values[valid].max()) if valid.any() else None,
+        }
+
+    return {
+        'version': AGGREGATE_VERSION,
+        'n_rows': int(len(df)),
+        'columns': list(df.columns),
+        'churn_levels': churn_levels,
+        'churn_counts': np.bincount(churn[churn >= 0], minlength=n_churn).tolist(),
+        'categorical': categorical,
+        'pairs': pairs,
+        'histograms': histograms,
+        # Pratinjau disimpan apa adanya agar halaman tidak perlu memuat dataset sama sekali
+        'preview': json.loads(df.head(PREVIEW_ROWS).to_json(orient='records', double_precision=6)),
+    }
+
+
+# --- Penggabungan (mode streaming) ---
+def _reindex(counts, axes_from, axes_to):
+    # Pindahkan matriks jumlah berlabel level ke urutan/himpunan level yang lebih lengkap
+    out = np.zeros([len(labels) for labels in axes_to], dtype=np.int64)
+    out[np.ix_(*[[to.index(level) for level in frm] for frm, to in zip(axes_from, axes_to)])] = counts
+    return out
+
+
+def _union(a, b):
+    # Kategori hasil read_csv terurut leksikal; urutan gabungan dibuat sama agar hasil streaming
+    # identik dengan pemuatan utuh
+    return sorted(set(a) | set(b))
+
+
+def merge_aggregates(a, b):
+    """Gabungkan dua agregat (mis. dari dua chunk) berdasarkan nama level."""
+    churn = _union(a['churn_levels'], b['churn_levels'])
+
+    def gabung(counts_a, axes_a, counts_b, axes_b, axes):
+        return (_reindex(np.asarray(counts_a, dtype=np.int64), axes_a, axes)
+                + _reindex(np.asarray(counts_b, dtype=np.int64), axes_b, axes)).tolist()
+
+    categorical = {}
+    for kolom, info in a['categorical'].items():
+        other = b['categorical'][kolom]
+        levels = _union(info['levels'], other['levels'])
+        categorical[kolom] = {
+            'levels': levels,
+            'counts': gabung(info['counts'], [info['levels'], a['churn_levels']],
+                             other['counts'], [other['levels'], b['churn_levels']], [levels, churn]),
+        }
+
+    pairs = {}
+    for key, counts in a['pairs'].items():
+        x, y = key.split('|')
+        axes_a = [a['categorical'][x]['levels'], a['categorical'][y]['levels'], a['churn_levels']]
+        axes_b = [b['categorical'][x]['levels'], b['categorical'][y]['levels'], b['churn_levels']]
+        axes = [categorical[x]['levels'], categorical[y]['levels'], churn]
+        pairs[key] = gabung(counts, axes_a, b['pairs'][key], axes_b, axes)
+
+    histograms = {}
+    for kolom, h in a['histograms'].items():
+        other = b['histograms'][kolom]
+        bins = list(range(len(h['counts'])))
+        mins = [v for v in (h['min'], other['min']) if v is not None]
+        maxs = [v for v in (h['max'], other['max']) if v is not None]
+        histograms[kolom] = {
+            'start': h['start'],
+            'width': h['width'],
+            'counts': gabung(h['counts'], [bins, a['churn_levels']], other['counts'], [bins, b['churn_levels']], [bins, churn]),
+            'min': min(mins) if mins else None,
+            'max': max(maxs) if maxs else None,
+        }
+
+    return {
+        'version': AGGREGATE_VERSION,
+        'n_rows': a['n_rows'] + b['n_rows'],
+        'columns': a['columns'],
+        'churn_levels': churn,
+        'churn_counts': gabung(a['churn_counts'], [a['churn_levels']], b['churn_counts'], [b['churn_levels']], [churn]),
+        'categorical': categorical,
+        'pairs': pairs,
+        'histograms': histograms,
+        'preview': (a['preview'] + b['preview'])[:PREVIEW_ROWS],
+    }
+
+
+def iter_aggregates(path, chunksize=STREAM_CHUNKSIZE):
+    """Agregasi CSV per chunk; menghasilkan (agregat kumulatif, fraksi file yang sudah dibaca).
+
+    Hanya satu chunk yang ada di memori pada satu waktu, jadi pemakaian memori ditentukan
+    `chunksize`, bukan ukuran file.
+    """
+    size = os.path.getsize(path) or 1
+    agg = None
+    with open(path, 'rb') as f:
+        for chunk in dataset.read_csv_typed(f, chunksize=chunksize):
+            hasil = compute_aggregates(chunk)
+            agg = hasil if agg is None else merge_aggregates(agg, hasil)
+            yield agg, min(f.tell() / size, 1.0)
+
+
+def aggregate_path(path, cache_dir=CACHE_DIR):
+    nama = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{nama}-{dataset.source_key(path)}-v{AGGREGATE_VERSION}.json")
+
+
+def save_aggregates(agg, path, cache_dir=CACHE_DIR):
+    target = aggregate_path(path, cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{target}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(agg, f)
+    os.replace(tmp, target)
+    return target
+
+
+def cached_aggregates(path, cache_dir=CACHE_DIR):
+    """Agregat tersimpan untuk `path`, atau None jika belum ada / file sumber sudah berubah."""
+    target = aggregate_path(path, cache_dir)
+    if not os.path.exists(target):
+        return None
+    with open(target, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_aggregates(path=dataset.DATA_PATH, cache_dir=CACHE_DIR, chunksize=None):
+    """Agregat untuk `path`; dihitung (dan disimpan) hanya jika file sumber berubah.
+
+    File di atas `STREAM_THRESHOLD_BYTES` (atau jika `chunksize` diberikan) diagregasi per chunk.
+    """
+    agg = cached_aggregates(path, cache_dir)
+    if agg is not None:
+        return agg
+
+    if chunksize is None and os.path.getsize(path) <= STREAM_THRESHOLD_BYTES:
+        agg = compute_aggregates(dataset.load_dataset(path))
+    else:
+        for agg, _ in iter_aggregates(path, chunksize or STREAM_CHUNKSIZE):
+            pass
+    save_aggregates(agg, path, cache_dir)
+    return agg
+
+
+# --- Bentuk Tampilan ---
+def churn_count(agg, level):
+    levels = agg['churn_levels']
+    return agg['churn_counts'][levels.index(level)] if level in levels else 0
+
+
+def churn_rate(agg, feature):
+    """Setara `pd.crosstab(df[feature], df['Churn'], normalize='index') * 100`."""
+    info = agg['categorical'][feature]
+    ct = pd.DataFrame(info['counts'], index=pd.Index(info['levels'], name=feature),
+                      columns=pd.Index(agg['churn_levels'], name='Churn'), dtype=float)
+    ct = ct[ct.sum(axis=1) > 0]
+    return ct.div(ct.sum(axis=1), axis=0) * 100
+
+
+def pair_churn_rate(agg, a, b, level='Yes'):
+    """Persentase `level` churn untuk setiap kombinasi level fitur `a` (baris) x `b` (kolom)."""
+    counts = np.asarray(agg['pairs'][f"{a}|{b}"], dtype=float)
+    total = counts.sum(axis=2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rate = counts[:, :, agg['churn_levels'].index(level)] / total * 100
+    return pd.DataFrame(rate, index=pd.Index(agg['categorical'][a]['levels'], name=a),
+                        columns=pd.Index(agg['categorical'][b]['levels'], name=b))
+
+
+def quantiles(agg, column, qs=(0.25, 0.5, 0.75), level=None):
+    """Kuantil perkiraan dari histogram ber-tepi tetap (galat maksimal satu lebar bin halus).
+
+    Histogram ini berfungsi sebagai sketsa kuantil yang bisa digabung antar-chunk. `level` membatasi
+    ke satu status churn; None memakai semua baris.
+    """
+    h = agg['histograms'][column]
+    counts = np.asarray(h['counts'], dtype=float)
+    counts = counts.sum(axis=1) if level is None else counts[:, agg['churn_levels'].index(level)]
+    cumulative = np.cumsum(counts)
+    if cumulative[-1] == 0:
+        return [None] * len(qs)
+    edges = h['start'] + h['width'] * np.arange(len(counts) + 1)
+    # Interpolasi linear di dalam bin, dibatasi ke nilai minimum/maksimum yang benar-benar teramati
+    posisi = np.interp(np.asarray(qs) * cumulative[-1], np.concatenate([[0.0], cumulative]), edges)
+    return np.clip(posisi, h['min'], h['max']).tolist()
+
+
+def histogram(agg, column, bins=20):
+    """Histogram tampilan (~`bins` bin dalam rentang data) beserta kurva KDE per status churn.
+
+    Bin halus dikelompokkan ulang; KDE diaproksimasi dengan menghaluskan bin halus memakai kernel
+    Gaussian (bandwidth aturan Scott seperti seaborn), sehingga biayanya tidak bergantung jumlah baris.
+    Mengembalikan (tepi bin, jumlah [bin x status], x kurva, kurva [titik x status]).
+    """
+    h = agg['histograms'][column]
+    counts = np.asarray(h['counts'], dtype=float)
+    start, width = h['start'], h['width']
+    n_bins = len(counts)
+    i0 = int(_bin_index(np.array([h['min']]), start, width, n_bins)[0])
+    i1 = int(_bin_index(np.array([h['max']]), start, width, n_bins)[0])
+    fine = counts[i0:i1 + 1]
+
+    group = max(1, int(np.ceil(len(fine) / bins)))
+    n_group = int(np.ceil(len(fine) / group))
+    padded = np.zeros((n_group * group, fine.shape[1]))
+    padded[:len(fine)] = fine
+    grouped = padded.reshape(n_group, group, -1).sum(axis=1)
+    edges = start + width * (i0 + group * np.arange(n_group + 1))
+
+    centers = start + width * (np.arange(n_bins) + 0.5)
+    curves = np.zeros((i1 - i0 + 1, counts.shape[1]))
+    for j in range(counts.shape[1]):
+        n = counts[:, j].sum()
+        if n < 2:
+            continue
+        mean = (counts[:, j] * centers).sum() / n
+        std = np.sqrt((counts[:, j] * (centers - mean) ** 2).sum() / (n - 1))
+        sigma = max(std * n ** (-1 / 5) / width, 0.5)
+        offsets = np.arange(-int(4 * sigma) - 1, int(4 * sigma) + 2)
+        kernel = np.exp(-0.5 * (offsets / sigma) ** 2)
+        smooth = np.convolve(counts[:, j], kernel / kernel.sum(), mode='same')
+        # Jumlah per bin halus -> jumlah per bin tampilan
+        curves[:, j] = smooth[i0:i1 + 1] * group
+    return edges, grouped, centers[i0:i1 + 1], curves
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hitung dan simpan agregat EDA untuk halaman Gambaran Dataset.")
+    parser.add_argument('--data', default=dataset.DATA_PATH)
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help=f"Agregasi per chunk tanpa memuat seluruh file (otomatis untuk file > "
+                             f"{STREAM_THRESHOLD_BYTES // 2 ** 20} MB)")
+    args = parser.parse_args(argv)
+
+    agg = cached_aggregates(args.data, args.cache_dir)
+    if agg is None and (args.chunksize or os.path.getsize(args.data) > STREAM_THRESHOLD_BYTES):
+        for agg, fraksi in iter_aggregates(args.data, args.chunksize or STREAM_CHUNKSIZE):
+            print(f"\r{fraksi:6.1%}  {agg['n_rows']:,} baris", end='', flush=True)
+        print()
+        save_aggregates(agg, args.data, args.cache_dir)
+    elif agg is None:
+        agg = load_aggregates(args.data, args.cache_dir)
+    print(f"{agg['n_rows']:,} baris, {len(agg['columns'])} kolom -> {aggregate_path(args.data, args.cache_dir)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""Rencana one-hot encoding tetap yang diturunkan sekali dari model_columns.
+
+Menggantikan `pd.get_dummies` + `reindex`: setiap nilai kategori mentah
+dipetakan langsung ke indeks kolom output dan ditulis ke matriks float64
+yang sudah dialokasikan. Hasil untuk satu baris dan untuk satu batch selalu
+identik karena tidak bergantung pada level yang kebetulan muncul di data.
+"""
+import numpy as np
+import pandas as pd
+
+from churn import timing
+
+KOLOM_NUMERIK = ['SeniorCitizen', 'tenure', 'MonthlyCharges', 'TotalCharges']
+KOLOM_KATEGORI = [
+    'Partner', 'Dependents', 'MultipleLines', 'InternetService', 'OnlineSecurity', 'OnlineBackup',
+    'DeviceProtection', 'TechSupport', 'StreamingTV', 'StreamingMovies', 'Contract',
+    'PaperlessBilling', 'PaymentMethod'
+]
+KOLOM_FITUR = [
+    'SeniorCitizen', 'Partner', 'Dependents', 'tenure', 'MultipleLines', 'InternetService',
+    'OnlineSecurity', 'OnlineBackup', 'DeviceProtection', 'TechSupport', 'StreamingTV',
+    'StreamingMovies', 'Contract', 'PaperlessBilling', 'PaymentMethod', 'MonthlyCharges', 'TotalCharges'
+]
+
+# Semua nilai mentah yang sah per kolom kategori (seperti di Churn.csv), termasuk level acuan tanpa kolom
+LEVEL_KATEGORI = {
+    **{kolom: ('No', 'Yes') for kolom in ('Partner', 'Dependents', 'PaperlessBilling')},
+    'MultipleLines': ('No', 'No phone service', 'Yes'),
+    'InternetService': ('DSL', 'Fiber optic', 'No'),
+    **{kolom: ('No', 'No internet service', 'Yes') for kolom in (
+        'OnlineSecurity', 'OnlineBackup', 'DeviceProtection', 'TechSupport', 'StreamingTV', 'StreamingMovies')},
+    'Contract': ('Month-to-month', 'One year', 'Two year'),
+    'PaymentMethod': ('Bank transfer (automatic)', 'Credit card (automatic)', 'Electronic check', 'Mailed check'),
+}
+
+
+def check_record(record):
+    """Tolak record dari luar (mis. layanan HTTP) yang akan ter-encode diam-diam dengan salah.
+
+    Level kategori yang tidak dikenal akan jatuh ke level acuan, dan angka yang tidak hingga/terlalu besar
+    merusak skor; keduanya menghasilkan ValueError (KeyError jika kolom tidak ada).
+    """
+    for kolom in ('SeniorCitizen', 'tenure', 'MonthlyCharges', 'TotalCharges'):
+        try:
+            nilai = float(record[kolom])
+        except OverflowError:
+            raise ValueError(f"{kolom} terlalu besar")
+        except (TypeError, ValueError):
+            if kolom == 'TotalCharges':
+                # TotalCharges kosong boleh (dihitung dari tenure x MonthlyCharges)
+                continue
+            raise
+        if not np.isfinite(nilai):
+            raise ValueError(f"{kolom} harus berupa angka hingga")
+    for kolom, levels in LEVEL_KATEGORI.items():
+        if record[kolom] not in levels:
+            raise ValueError(f"{kolom} tidak dikenal: {record[kolom]!r}. Pilihan: {', '.join(levels)}")
+
+
+class EncoderPlan:
+    """Pemetaan (kolom, nilai) -> indeks kolom output, dibangun dari model_columns.
+
+    Nilai yang merupakan level acuan (yang dibuang `drop_first` saat training),
+    termasuk "No internet service"/"No phone service" yang dinormalisasi menjadi
+    "No", tidak punya kolom sehingga barisnya tetap bernilai 0 - sama seperti
+    hasil `reindex(fill_value=0)` sebelumnya.
+    """
+
+    def __init__(self, model_columns):
+        self.model_columns = list(model_columns)
+        posisi = {kolom: idx for idx, kolom in enumerate(self.model_columns)}
+
+        self.numeric_index = {kolom: posisi[kolom] for kolom in KOLOM_NUMERIK}
+        self.category_index = {}
+        for kolom in KOLOM_KATEGORI:
+            prefix = f"{kolom}_"
+            self.category_index[kolom] = {
+                nama[len(prefix):]: idx for nama, idx in posisi.items() if nama.startswith(prefix)
+            }
+
+    @property
+    def n_features(self):
+        return len(self.model_columns)
+
+    def transform(self, df, out=None):
+        """Encode DataFrame mentah (format Churn.csv) ke matriks (n_baris, n_fitur)."""
+        n = len(df)
+        if out is None:
+            out = np.zeros((n, self.n_features), dtype=np.float64)
+        else:
+            out = out[:n]
+            out.fill(0.0)
+
+        with timing.span('encode'):
+            tenure = df['tenure'].to_numpy(dtype=np.float64)
+            monthly = df['MonthlyCharges'].to_numpy(dtype=np.float64)
+            total = pd.to_numeric(df['TotalCharges'], errors='coerce').to_numpy(dtype=np.float64)
+            # TotalCharges kosong di Churn.csv hanya muncul saat tenure=0
+            total = np.where(tenure == 0, 0.0, total)
+            total = np.where(np.isnan(total), tenure * monthly, total)
+
+            out[:, self.numeric_index['SeniorCitizen']] = df['SeniorCitizen'].to_numpy(dtype=np.float64)
+            out[:, self.numeric_index['tenure']] = tenure
+            out[:, self.numeric_index['MonthlyCharges']] = monthly
+            out[:, self.numeric_index['TotalCharges']] = total
+
+        with timing.span('align'):
+            for kolom, levels in self.category_index.items():
+                nilai = df[kolom].to_numpy(dtype=object)
+                for level, idx in levels.items():
+                    out[:, idx] = nilai == level
+        return out
+
+    def transform_record(self, record, out=None):
+        """Encode satu pelanggan (dict seperti `input_dict` di halaman prediksi) ke matriks 1 x n_fitur."""
+        if out is None:
+            out = np.zeros((1, self.n_features), dtype=np.float64)
+        else:
+            out = out[:1]
+            out.fill(0.0)
+        row = out[0]
+
+        with timing.span('encode'):
+            tenure = float(record['tenure'])
+            monthly = float(record['MonthlyCharges'])
+            try:
+                total = float(record['TotalCharges'])
+            except (TypeError, ValueError):
+                total = float('nan')
+            if tenure == 0:
+                total = 0.0
+            elif total != total:
+                total = tenure * monthly
+
+            row[self.numeric_index['SeniorCitizen']] = float(record['SeniorCitizen'])
+            row[self.numeric_index['tenure']] = tenure
+            row[self.numeric_index['MonthlyCharges']] = monthly
+            row[self.numeric_index['TotalCharges']] = total
+
+        with timing.span('align'):
+            for kolom, levels in self.category_index.items():
+                idx = levels.get(record[kolom])
+                if idx is not None:
+                    row[idx] = 1.0
+        return out
@@ -0,0 +1,178 @@
+"""Evaluasi model yang ter-deploy pada split uji (held-out) dan simpan hasilnya.
+
+Menghasilkan `saved_models/evaluation.json` berisi metrik klasifikasi, confusion
+matrix, classification report, serta latensi/throughput inferensi per model.
+Halaman "Pelatihan & Evaluasi Model" dirender dari file ini, dan setiap entri
+menyimpan sidik jari (hash) file model sehingga hasil yang basi bisa dikenali.
+
+Contoh:
+    python -m churn.evaluate
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, f1_score, precision_score, recall_score
+
+from churn import pipeline, portable, train
+from churn.fused import DEFAULT_THRESHOLD, fused_path
+
+EVALUATION_FILE = 'evaluation.json'
+
+
+def model_fingerprint(name, base_path=pipeline.BASE_PATH):
+    """Hash dari file yang benar-benar dimuat `pipeline.load_fused` untuk model ini."""
+    sidik = portable.model_fingerprint(name, base_path)
+    if sidik is not None:
+        return sidik
+    path = fused_path(name, base_path)
+    files = [path] if os.path.exists(path) else [
+        os.path.join(base_path, pipeline.MODEL_FILES[name]),
+        os.path.join(base_path, 'scaler.pkl'),
+        os.path.join(base_path, 'model_columns.pkl'),
+    ]
+    h = hashlib.sha256()
+    for file in files:
+        with open(file, 'rb') as f:
+            for blok in iter(lambda: f.read(1 << 20), b''):
+                h.update(blok)
+    return h.hexdigest()[:16]
+
+
+def measure_latency(model, X, n_single=500, min_batch_seconds=0.2):
+    """Latensi per baris (p50/p99, ms) untuk permintaan satu baris dan throughput batch (baris/detik)."""
+    samples = np.empty(min(n_single, len(X)))
+    for i in range(len(samples)):
+        row = X[i:i + 1]
+        start = time.perf_counter()
+        model.predict_label_proba(row)
+        samples[i] = time.perf_counter() - start
+
+    rows = 0
+    start = time.perf_counter()
+    while True:
+        model.predict_label_proba(X)
+        rows += len(X)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_batch_seconds:
+            break
+
+    return {
+        'p50_ms': round(float(np.percentile(samples, 50) * 1e3), 4),
+        'p99_ms': round(float(np.percentile(samples, 99) * 1e3), 4),
+        'rows_per_s': round(rows / elapsed, 1),
+    }
+
+
+def classification_metrics(y_test, y_pred):
+    """Metrik klasifikasi yang sama untuk evaluation.json dan metrics.json pelatihan."""
+    return {
+        'accuracy': round(float(accuracy_score(y_test, y_pred)), 4),
+        'precision_churn': round(float(precision_score(y_test, y_pred)), 4),
+        'recall_churn': round(float(recall_score(y_test, y_pred)), 4),
+        'f1_churn': round(float(f1_score(y_test, y_pred)), 4),
+        'confusion_matrix': confusion_matrix(y_test, y_pred).tolist(),
+    }
+
+
+def score_model(model, X_test, y_test, threshold=DEFAULT_THRESHOLD):
+    """Metrik `FusedModel` pada X_test mentah; label dari `Prob_Churn >= threshold` seperti di aplikasi."""
+    y_pred, _ = model.predict_label_proba(X_test, threshold)
+    return classification_metrics(y_test, y_pred), y_pred
+
+
+def evaluate_model(name, X_test, y_test, base_path=pipeline.BASE_PATH, threshold=DEFAULT_THRESHOLD):
+    model = pipeline.load_fused(name, base_path)
+    metrics, y_pred = score_model(model, X_test, y_test, threshold)
+    return {
+        **metrics,
+        'classification_report': classification_report(y_test, y_pred, target_names=['No', 'Yes']),
+        'latency': measure_latency(model, X_test),
+        'fingerprint': model_fingerprint(name, base_path),
+    }
+
+
+def run_evaluation(data_path=os.path.join('data', 'Churn.csv'), base_path=pipeline.BASE_PATH,
+                   cache_dir=train.CACHE_DIR, names=None):
+    data = train.load_prepared(data_path, cache_dir=cache_dir)
+    hasil = {
+        'generated_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'data': data_path,
+        'n_test': int(len(data['y_test'])),
+        'models': {},
+    }
+    for name in names or pipeline.available_models(base_path):
+        hasil['models'][name] = evaluate_model(name, data['X_test'], data['y_test'], base_path)
+
+    # File sementara lalu `os.replace`: halaman Pelatihan dan Evaluasi tidak pernah membaca JSON setengah tertulis
+    path = os.path.join(base_path, EVALUATION_FILE)
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(hasil, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+    return hasil
+
+
+def load_evaluation(base_path=pipeline.BASE_PATH):
+    path = os.path.join(base_path, EVALUATION_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def model_files_state(base_path=pipeline.BASE_PATH):
+    """(path, mtime_ns, ukuran) setiap file yang menentukan sidik jari model, tanpa membaca isinya.
+
+    Dipakai sebagai kunci cache `stale_models`: hanya berubah jika ada file model yang ditulis, muncul, atau hilang.
+    """
+    paths = [
+        os.path.join(portable.portable_dir(base_path), portable.MANIFEST_FILE),
+        os.path.join(base_path, 'scaler.pkl'),
+        os.path.join(base_path, 'model_columns.pkl'),
+    ]
+    for name, filename in pipeline.MODEL_FILES.items():
+        paths += [fused_path(name, base_path), os.path.join(base_path, filename)]
+    state = []
+    for path in paths:
+        try:
+            info = os.stat(path)
+        except FileNotFoundError:
+            continue
+        state.append((path, info.st_mtime_ns, info.st_size))
+    return tuple(state)
+
+
+def stale_models(evaluation, base_path=pipeline.BASE_PATH):
+    """Model yang file-nya sudah berubah (atau hilang) sejak evaluasi terakhir."""
+    tersedia = set(pipeline.available_models(base_path))
+    return [
+        name for name, hasil in evaluation['models'].items()
+        if name not in tersedia or model_fingerprint(name, base_path) != hasil['fingerprint']
+    ] + sorted(tersedia - set(evaluation['models']))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluasi model churn pada split uji dan simpan evaluation.json.")
+    parser.add_argument('--data', default=os.path.join('data', 'Churn.csv'))
+    parser.add_argument('--models-dir', default=pipeline.BASE_PATH)
+    parser.add_argument('--cache-dir', default=train.CACHE_DIR)
+    parser.add_argument('--model', choices=sorted(pipeline.MODEL_FILES), action='append',
+                        help="Model yang dievaluasi (bisa diulang). Default: semua model yang tersedia.")
+    args = parser.parse_args(argv)
+
+    hasil = run_evaluation(args.data, args.models_dir, args.cache_dir, args.model)
+    for name, m in hasil['models'].items():
+        lat = m['latency']
+        print(f"- {name}: F1 {m['f1_churn']:.4f}, akurasi {m['accuracy']:.4f}, "
+              f"p50 {lat['p50_ms']:.3f} ms, p99 {lat['p99_ms']:.3f} ms, {lat['rows_per_s']:,.0f} baris/s")
+    print(f"Hasil -> {os.path.join(args.models_dir, EVALUATION_FILE)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
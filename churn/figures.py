@@ -0,0 +1,90 @@
+"""Cache grafik matplotlib/seaborn yang sudah dirender.
+
+Setiap rerun Streamlit (interaksi widget apa pun) menjalankan ulang seluruh
+halaman. Daripada membangun ulang `plt.subplots` setiap kali, grafik dirender
+sekali per (hash data, id grafik, tema) menjadi bytes PNG/SVG lalu disajikan
+dari cache. Objek Figure langsung ditutup setelah dirender sehingga memori
+tidak bertambah per sesi. Cache dipakai bersama oleh semua sesi dalam satu
+proses dan dibatasi jumlah entri serta total ukurannya (LRU).
+"""
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+
+import matplotlib.pyplot as plt
+
+DEFAULT_MAXSIZE = 256
+DEFAULT_MAX_BYTES = 64 * 2 ** 20
+# Sama dengan resolusi yang dipakai `st.pyplot`
+DPI = 200
+
+
+def content_key(*parts):
+    """Hash pendek dari data apa pun yang bisa di-JSON-kan (mis. hasil evaluasi)."""
+    raw = json.dumps(parts, sort_keys=True, default=str).encode()
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+
+def render(fig, fmt='png'):
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, dpi=DPI, bbox_inches='tight')
+    return buf.getvalue()
+
+
+class FigureCache:
+    """LRU berbatas untuk bytes grafik; aman dipakai dari banyak thread sesi Streamlit."""
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, max_bytes=DEFAULT_MAX_BYTES):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get_or_render(self, key, draw, fmt='png'):
+        """Bytes grafik untuk `key`; `draw()` (yang mengembalikan Figure) hanya dipanggil saat miss."""
+        key = (*key, fmt)
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return data
+            self.misses += 1
+
+        # Render di luar lock agar sesi lain tetap bisa dilayani dari cache
+        fig = draw()
+        try:
+            data = render(fig, fmt)
+        finally:
+            plt.close(fig)
+
+        with self._lock:
+            if key not in self._items:
+                self._items[key] = data
+                self._bytes += len(data)
+            while self._items and (len(self._items) > self.maxsize or self._bytes > self.max_bytes):
+                _, lama = self._items.popitem(last=False)
+                self._bytes -= len(lama)
+        return data
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._items), 'bytes': self._bytes, 'hits': self.hits, 'misses': self.misses}
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+
+# Satu cache per proses, dipakai bersama oleh semua halaman dan sesi
+default_cache = FigureCache()
+
+
+def cached_figure(key, draw, fmt='png'):
+    return default_cache.get_or_render(key, draw, fmt)
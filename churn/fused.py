@@ -0,0 +1,414 @@
+"""Artefak inferensi gabungan: scaler + model + model_columns dalam satu file.
+
+- Model linear (Logistic Regression): standardisasi dilipat ke bobot, sehingga
+  prediksi cukup satu perkalian matriks pada fitur mentah hasil encoding.
+- XGBoost: booster disimpan dalam format native UBJ (bukan pickle wrapper
+  sklearn) dan dijalankan dengan `inplace_predict` pada buffer kontigu
+  (tanpa DMatrix); label dan probabilitas berasal dari satu kali evaluasi pohon.
+- SVM aproksimasi (`churn.approx_svm`): peta kernel Nyström/RFF dan bobot
+  linear dilipat menjadi satu vektor, sehingga biayanya setara model linear
+  dengan `n_components` fitur.
+- SVM (kernel RBF): fungsi keputusan dihitung langsung dengan NumPy dari
+  support vector dan dual coef, lalu Platt scaling persis seperti libsvm.
+- Random Forest: pohon diratakan menjadi array kontigu (`churn.compact_forest`)
+  dan ditelusuri untuk semua (baris, pohon) sekaligus dengan NumPy. Jalur ini
+  jauh lebih cepat untuk input kecil (satu form: ±0,5 ms vs ±14 ms), tetapi per
+  baris ±2x lebih lambat dari traversal Cython sklearn pada batch besar. Artefak
+  hanya berisi array ringkas; forest sklearn bisa dimuat terpisah dari pickle
+  (`pipeline.load_fused(..., sklearn_forest=True)`) agar batch besar dialihkan ke sana.
+- Estimator lain: scaler diterapkan in-place pada buffer yang sudah
+  dialokasikan, lalu diteruskan ke estimator.
+
+Artefak disimpan tanpa kompresi dan array NumPy besar (support vector,
+titik pusat kernel, node pohon) dimuat dengan `mmap_mode='r'`: beberapa
+proses worker yang memuat file yang sama berbagi satu salinan di page cache,
+dan start ulang hanya memetakan file tanpa menyalin isinya. Booster XGBoost
+tidak termasuk: byte-nya di-parse XGBoost ke struktur pohon milik setiap proses.
+
+Membuat artefak untuk semua model yang tersedia:
+    python -m churn.fused
+"""
+import argparse
+import os
+import sys
+import threading
+
+import joblib
+import numpy as np
+
+from churn import timing
+
+ARTIFACT_VERSION = 4
+DEFAULT_THRESHOLD = 0.5
+FUSED_SUFFIX = '_fused.joblib'
+# Baris per blok matriks kernel (blok x jumlah support vector float64) agar memori tetap terbatas
+KERNEL_BLOCK_ROWS = 2048
+# Baris per blok traversal forest, dan jumlah langkah sebelum pasangan (baris, pohon) yang sudah di daun dibuang
+FOREST_BLOCK_ROWS = 1024
+FOREST_COMPACT_EVERY = 4
+# Mulai ukuran batch ini forest sklearn (jika dimuat, lihat `pipeline.load_fused`) lebih cepat dari traversal NumPy
+FOREST_SKLEARN_MIN_ROWS = 768
+# Buffer scaling per thread hanya dipakai ulang sampai ukuran ini (4096 x 21 kolom float64 ±0,7 MB);
+# batch yang lebih besar mendapat array sendiri agar satu skoring besar tidak menahan memori selamanya
+SCALED_BUFFER_MAX_ROWS = 4096
+
+
+class FusedModel:
+    """Model siap pakai yang menerima matriks hasil `EncoderPlan` (belum di-scale)."""
+
+    def __init__(self, name, kind, model_columns, mean=None, scale=None, estimator=None, coef=None, intercept=None,
+                 booster=None, kernel=None, forest=None):
+        self.name = name
+        self.kind = kind
+        self.model_columns = list(model_columns)
+        self.mean = mean
+        self.scale = scale
+        self.estimator = estimator
+        self.coef = coef
+        self.intercept = intercept
+        self.booster = booster
+        self.kernel = kernel
+        self.forest = forest
+        self._local = threading.local()
+
+    # --- Konversi ke/dari artefak ---
+    def to_artifact(self):
+        return {
+            'version': ARTIFACT_VERSION,
+            'name': self.name,
+            'kind': self.kind,
+            'model_columns': self.model_columns,
+            'mean': self.mean,
+            'scale': self.scale,
+            # Forest sklearn opsional untuk batch besar tidak ikut disimpan: array ringkas sudah cukup, dan
+            # pickle-nya (±50 MB per proses setelah dimuat, tidak bisa di-mmap) dimuat terpisah hanya jika diminta
+            'estimator': self.estimator if self.kind != 'forest' else None,
+            'coef': self.coef,
+            'intercept': self.intercept,
+            # Array uint8 (bukan bytes) agar dibaca langsung dari file tanpa salinan perantara; booster
+            # tetap di-parse ke memori XGBoost sendiri, jadi tidak berbagi page cache seperti array lain
+            'booster': np.frombuffer(self.booster.save_raw('ubj'), dtype=np.uint8) if self.booster is not None else None,
+            'kernel': self.kernel,
+            'forest': self.forest,
+        }
+
+    @classmethod
+    def from_artifact(cls, artifact):
+        if artifact.get('version') != ARTIFACT_VERSION:
+            raise ValueError(
+                f"Versi artefak {artifact.get('version')} tidak didukung (diharapkan {ARTIFACT_VERSION}). "
+                "Jalankan ulang `python -m churn.fused`."
+            )
+        booster = None
+        if artifact['booster'] is not None:
+            booster = load_booster(bytearray(artifact['booster']))
+        return cls(
+            artifact['name'], artifact['kind'], artifact['model_columns'],
+            mean=artifact['mean'], scale=artifact['scale'], estimator=artifact['estimator'],
+            coef=artifact['coef'], intercept=artifact['intercept'], booster=booster, kernel=artifact['kernel'],
+            forest=artifact.get('forest')
+        )
+
+    # --- Inferensi ---
+    def _scaled(self, X):
+        # Buffer per thread: satu objek dipakai bersama oleh banyak sesi Streamlit
+        if X.shape[0] > SCALED_BUFFER_MAX_ROWS:
+            out = np.empty(X.shape, dtype=np.float64)
+        else:
+            buf = getattr(self._local, 'buf', None)
+            if buf is None or buf.shape[0] < X.shape[0]:
+                buf = np.empty((max(X.shape[0], 1), X.shape[1]), dtype=np.float64)
+                self._local.buf = buf
+            out = buf[:X.shape[0]]
+        with timing.span('scale', self.name):
+            np.subtract(X, self.mean, out=out)
+            np.divide(out, self.scale, out=out)
+        return out
+
+    def _booster_predict(self, X, **kwargs):
+        # Standardisasi tetap float64 seperti StandardScaler; XGBoost membaca buffer kontigu ini
+        # langsung (tanpa DMatrix) dan membulatkan ke float32 per elemen. Membulatkan lebih awal
+        # akan menggeser nilai biner hasil scaling yang tepat berada di ambang split `hist`.
+        Z = self._scaled(X)
+        with timing.span('predict', self.name):
+            return self.booster.inplace_predict(Z, **kwargs)
+
+    def decision_function(self, X):
+        if self.kind == 'xgboost':
+            return self._booster_predict(X, predict_type='margin')
+        Z = X if self.kind == 'linear' else self._scaled(X)
+        with timing.span('predict', self.name):
+            if self.kind == 'linear':
+                return Z @ self.coef + self.intercept
+            if self.kind in ('kernel_linear', 'kernel_svm'):
+                out = np.empty(len(Z), dtype=np.float64)
+                for start in range(0, len(Z), KERNEL_BLOCK_ROWS):
+                    blok = Z[start:start + KERNEL_BLOCK_ROWS]
+                    out[start:start + len(blok)] = self._kernel_features(blok) @ self.coef
+                return out + self.intercept
+            return self.estimator.decision_function(Z)
+
+    def _kernel_features(self, Z):
+        if self.kernel['type'] == 'rff':
+            return np.cos(Z @ self.kernel['weights'] + self.kernel['offset'])
+        # RBF terhadap titik pusat Nyström: exp(-gamma * ||z - c||^2)
+        centers = self.kernel['centers']
+        jarak = (Z * Z).sum(axis=1)[:, None] - 2.0 * (Z @ centers.T) + self.kernel['center_norms'][None, :]
+        np.maximum(jarak, 0.0, out=jarak)
+        return np.exp(-self.kernel['gamma'] * jarak, out=jarak)
+
+    def predict_proba(self, X):
+        if self.kind == 'kernel_svm':
+            return _platt_proba(self.decision_function(X), self.kernel['prob_a'], self.kernel['prob_b'])
+        if self.kind in ('linear', 'kernel_linear'):
+            proba_churn = _expit(self.decision_function(X))
+        elif self.kind == 'xgboost':
+            proba_churn = self._booster_predict(X).astype(np.float64)
+        elif self.kind == 'forest':
+            Z = self._scaled(X)
+            with timing.span('predict', self.name):
+                if self.estimator is not None and len(Z) >= FOREST_SKLEARN_MIN_ROWS:
+                    proba_churn = self.estimator.predict_proba(Z)[:, 1]
+                else:
+                    proba_churn = _forest_proba(self.forest, Z)
+        else:
+            Z = self._scaled(X)
+            with timing.span('predict', self.name):
+                return self.estimator.predict_proba(Z)
+        return np.column_stack([1.0 - proba_churn, proba_churn])
+
+    def predict_label_proba(self, X, threshold=DEFAULT_THRESHOLD):
+        """Label dan probabilitas dari satu kali inferensi.
+
+        Label selalu diturunkan dari `Prob_Churn >= threshold`, sehingga konsisten dengan
+        probabilitas yang ditampilkan (termasuk untuk SVC, yang `predict`-nya tidak memakai Platt scaling).
+        """
+        proba = self.predict_proba(X)
+        return (proba[:, 1] >= threshold).astype(np.int64), proba
+
+    def predict(self, X, threshold=DEFAULT_THRESHOLD):
+        return self.predict_label_proba(X, threshold)[0]
+
+
+def _expit(x):
+    # Sigmoid yang stabil tanpa scipy: exp hanya dihitung dari -|x|
+    e = np.exp(-np.abs(x))
+    return np.where(x >= 0, 1.0 / (1.0 + e), e / (1.0 + e))
+
+
+def load_booster(raw, nthread=None):
+    """Booster XGBoost dari file/bytes format native (JSON atau UBJ)."""
+    import xgboost as xgb
+
+    booster = xgb.Booster()
+    booster.load_model(raw)
+    # Batch besar memakai semua core; booster aman dipakai bersama antar-thread
+    booster.set_param({'nthread': nthread or os.cpu_count() or 1})
+    return booster
+
+
+def fuse(name, estimator, scaler, model_columns):
+    """Gabungkan estimator terlatih dengan StandardScaler-nya."""
+    # sklearn hanya diperlukan saat membangun dari pickle; inferensi dari artefak tidak mengimpornya
+    from sklearn.kernel_approximation import Nystroem, RBFSampler
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+    from sklearn.svm import SVC
+
+    mean = np.asarray(scaler.mean_, dtype=np.float64)
+    scale = np.asarray(scaler.scale_, dtype=np.float64)
+
+    if isinstance(estimator, LogisticRegression) and estimator.coef_.shape[0] == 1:
+        # w' = w / s dan b' = b - sum(w * m / s), sehingga w'x + b' = w((x - m) / s) + b
+        w = estimator.coef_[0] / scale
+        b = float(estimator.intercept_[0] - np.dot(w, mean))
+        return FusedModel(name, 'linear', model_columns, coef=w, intercept=b)
+
+    if isinstance(estimator, Pipeline) and isinstance(estimator[-1], LogisticRegression) \
+            and isinstance(estimator[0], (Nystroem, RBFSampler)):
+        return _fuse_kernel_map(name, estimator[0], estimator[-1], mean, scale, model_columns)
+
+    if isinstance(estimator, SVC) and estimator.kernel == 'rbf' and estimator.probability \
+            and len(estimator.classes_) == 2:
+        return _fuse_svc(name, estimator, mean, scale, model_columns)
+
+    if type(estimator).__name__ == 'RandomForestClassifier' and len(estimator.classes_) == 2:
+        from churn.compact_forest import flatten_forest
+        return FusedModel(name, 'forest', model_columns, mean=mean, scale=scale, forest=flatten_forest(estimator))
+
+    if type(estimator).__name__ == 'XGBClassifier':
+        booster = load_booster(estimator.get_booster().save_raw('ubj'))
+        return FusedModel(name, 'xgboost', model_columns, mean=mean, scale=scale, booster=booster)
+
+    return FusedModel(name, 'pipeline', model_columns, mean=mean, scale=scale, estimator=estimator)
+
+
+def _fuse_kernel_map(name, feature_map, clf, mean, scale, model_columns):
+    from sklearn.kernel_approximation import Nystroem
+
+    w = clf.coef_[0]
+    if isinstance(feature_map, Nystroem):
+        # Nystroem: phi(z) = K(z, C) @ N.T, sehingga phi(z) @ w = K(z, C) @ (N.T @ w)
+        centers = np.ascontiguousarray(feature_map.components_, dtype=np.float64)
+        kernel = {
+            'type': 'rbf',
+            'gamma': float(feature_map.gamma),
+            'centers': centers,
+            'center_norms': (centers * centers).sum(axis=1),
+        }
+        coef = feature_map.normalization_.T @ w
+    else:
+        # RBFSampler: phi(z) = sqrt(2/m) * cos(z @ W + o)
+        kernel = {
+            'type': 'rff',
+            'weights': np.ascontiguousarray(feature_map.random_weights_, dtype=np.float64),
+            'offset': np.asarray(feature_map.random_offset_, dtype=np.float64),
+        }
+        coef = w * np.sqrt(2.0 / feature_map.n_components)
+    return FusedModel(name, 'kernel_linear', model_columns, mean=mean, scale=scale,
+                      coef=coef, intercept=float(clf.intercept_[0]), kernel=kernel)
+
+
+def _fuse_svc(name, svc, mean, scale, model_columns):
+    # decision_function sklearn (biner) = K(z, SV) @ dual_coef_ + intercept_, bentuk yang sama dengan Nyström
+    centers = np.ascontiguousarray(svc.support_vectors_, dtype=np.float64)
+    kernel = {
+        'type': 'rbf',
+        'gamma': float(svc._gamma),
+        'centers': centers,
+        'center_norms': (centers * centers).sum(axis=1),
+        'prob_a': float(svc.probA_[0]),
+        'prob_b': float(svc.probB_[0]),
+    }
+    return FusedModel(name, 'kernel_svm', model_columns, mean=mean, scale=scale,
+                      coef=np.ascontiguousarray(svc.dual_coef_[0], dtype=np.float64),
+                      intercept=float(svc.intercept_[0]), kernel=kernel)
+
+
+def _platt_proba(decision, prob_a, prob_b, min_prob=1e-7, max_iter=100):
+    """`predict_proba` SVC biner dari fungsi keputusan, sama dengan libsvm.
+
+    libsvm menghitung r = P(kelas 0) dengan sigmoid Platt, lalu menjalankan pairwise coupling iteratif
+    yang berhenti begitu galatnya < 0.005 / 2, sehingga hasilnya tidak persis [r, 1 - r]. Iterasi yang
+    sama dijalankan di sini per baris (vektorisasi) agar probabilitas identik dengan `SVC.predict_proba`.
+    """
+    r = np.clip(_expit(prob_a * decision - prob_b), min_prob, 1.0 - min_prob)
+    q01 = -r * (1.0 - r)
+    Q = np.empty((len(r), 2, 2), dtype=np.float64)
+    Q[:, 0, 0] = (1.0 - r) ** 2
+    Q[:, 1, 1] = r ** 2
+    Q[:, 0, 1] = Q[:, 1, 0] = q01
+
+    p = np.full((len(r), 2), 0.5)
+    aktif = np.arange(len(r))
+    for _ in range(max_iter):
+        if not len(aktif):
+            break
+        Qa, pa = Q[aktif], p[aktif]
+        Qp = np.einsum('nij,nj->ni', Qa, pa)
+        pQp = (pa * Qp).sum(axis=1)
+        lanjut = np.abs(Qp - pQp[:, None]).max(axis=1) >= 0.005 / 2
+        aktif, Qa, pa, Qp, pQp = aktif[lanjut], Qa[lanjut], pa[lanjut], Qp[lanjut], pQp[lanjut]
+        for t in range(2):
+            diff = (pQp - Qp[:, t]) / Qa[:, t, t]
+            pa[:, t] += diff
+            pQp = (pQp + diff * (diff * Qa[:, t, t] + 2.0 * Qp[:, t])) / (1.0 + diff) ** 2
+            Qp = (Qp + diff[:, None] * Qa[:, t, :]) / (1.0 + diff)[:, None]
+            pa /= (1.0 + diff)[:, None]
+        p[aktif] = pa
+    return p
+
+
+def _forest_proba(forest, Z):
+    """Rata-rata P(churn) semua pohon dari forest hasil `compact_forest.flatten_forest`.
+
+    Semua pasangan (baris, pohon) dalam satu blok maju satu level per langkah: anak kiri selalu node
+    berikutnya (urutan pre-order), anak kanan dibaca dari `right`. Daun punya threshold NaN dan
+    `right` ke dirinya sendiri sehingga diam di tempat; pasangan yang sudah di daun dibuang berkala.
+    """
+    # Seperti sklearn, fitur dibandingkan sebagai float32 (threshold sudah dibulatkan ke bawah ke float32)
+    Z = np.ascontiguousarray(Z, dtype=np.float32)
+    n, n_features = Z.shape
+    feature, threshold, right, value = forest['feature'], forest['threshold'], forest['right'], forest['value']
+    roots = np.asarray(forest['roots'], dtype=np.intp)
+    out = np.empty(n, dtype=np.float64)
+    for start in range(0, n, FOREST_BLOCK_ROWS):
+        blok = Z[start:start + FOREST_BLOCK_ROWS]
+        flat = blok.ravel()
+        daun = np.tile(roots, len(blok))
+        aktif = np.arange(len(daun))
+        node = daun.copy()
+        offset = np.repeat(np.arange(len(blok), dtype=np.intp) * n_features, len(roots))
+        while len(aktif):
+            for _ in range(FOREST_COMPACT_EVERY):
+                posisi = np.take(feature, node).astype(np.intp)
+                posisi += offset
+                ke_kiri = np.take(flat, posisi) <= np.take(threshold, node)
+                kanan = np.take(right, node)
+                node += 1
+                np.copyto(node, kanan, where=~ke_kiri)
+            daun[aktif] = node
+            lanjut = ~np.isnan(np.take(threshold, node))
+            aktif, node, offset = aktif[lanjut], node[lanjut], offset[lanjut]
+        out[start:start + len(blok)] = np.take(value, daun).reshape(len(blok), len(roots)).mean(axis=1, dtype=np.float64)
+    return out
+
+
+def fused_path(name, base_path):
+    return os.path.join(base_path, f"{name}{FUSED_SUFFIX}")
+
+
+def save_fused(fused, base_path):
+    path = fused_path(fused.name, base_path)
+    # Tanpa kompresi: syarat agar array bisa dimuat dengan mmap_mode. Ditulis ke file sementara lalu
+    # diganti atomik: proses yang sedang memetakan artefak lama tetap memegang inode lamanya
+    joblib.dump(fused.to_artifact(), f"{path}.tmp", compress=0)
+    os.replace(f"{path}.tmp", path)
+    return path
+
+
+def native_booster_path(name, base_path, fmt='ubj'):
+    return os.path.join(base_path, f"{name}_churn_model.{fmt}")
+
+
+def save_native_booster(fused, base_path, fmt='ubj'):
+    """Simpan booster XGBoost ke format native (`.ubj` atau `.json`) agar bisa dipakai tanpa pickle."""
+    path = native_booster_path(fused.name, base_path, fmt)
+    with open(f"{path}.tmp", 'wb') as f:
+        f.write(fused.booster.save_raw(fmt))
+    os.replace(f"{path}.tmp", path)
+    return path
+
+
+def load_fused_artifact(path, mmap_mode='r'):
+    """Muat artefak gabungan; array NumPy di dalamnya dipetakan read-only dari file (dibagi antar-proses)."""
+    return FusedModel.from_artifact(joblib.load(path, mmap_mode=mmap_mode))
+
+
+def main(argv=None):
+    from churn import pipeline
+
+    parser = argparse.ArgumentParser(description="Buat artefak gabungan (scaler + model) untuk setiap model churn.")
+    parser.add_argument('--models-dir', default=pipeline.BASE_PATH, help="Folder berisi file .pkl")
+    parser.add_argument('--model', choices=sorted(pipeline.MODEL_FILES), action='append',
+                        help="Model yang diekspor (bisa diulang). Default: semua model yang tersedia.")
+    parser.add_argument('--xgb-format', choices=['ubj', 'json'], default='ubj',
+                        help="Format file booster XGBoost native yang ikut ditulis")
+    args = parser.parse_args(argv)
+
+    scaler, model_columns = pipeline.load_preprocessors(args.models_dir)
+    for name in args.model or list(pipeline.MODEL_FILES):
+        try:
+            estimator = pipeline.load_model(name, args.models_dir)
+        except FileNotFoundError:
+            print(f"- {name}: dilewati, file {pipeline.MODEL_FILES[name]} tidak ditemukan")
+            continue
+        fused = fuse(name, estimator, scaler, model_columns)
+        print(f"- {name}: {fused.kind} -> {save_fused(fused, args.models_dir)}")
+        if fused.kind == 'xgboost':
+            print(f"  booster native -> {save_native_booster(fused, args.models_dir, args.xgb_format)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""Pembaruan online Logistic Regression dari data churn berlabel yang baru masuk.
+
+Alih-alih melatih ulang seluruh notebook setiap bulan, bobot
+`logistic_regression_churn_model.pkl` dipakai sebagai titik awal
+`SGDClassifier(loss='log_loss')` lalu diperbarui dengan `partial_fit` per
+mini-batch. Setiap batch dibaca dari CSV (format Churn.csv, kolom `Churn`
+berisi Yes/No), di-encode dengan `EncoderPlan`, dan di-scale dengan scaler
+yang sama dengan aplikasi. Hanya satu batch yang ada di memori, sehingga
+waktu sebanding dengan jumlah baris baru dan memori tetap konstan.
+
+Sebelum dipakai untuk belajar, setiap batch lebih dulu dinilai dengan bobot
+saat itu (progressive validation), sehingga log loss/akurasi yang dilaporkan
+adalah performa pada data yang belum pernah dilihat model.
+
+Model hasilnya tetap `LogisticRegression` (bobot SGD disalin ke salinan model
+lama) dan diterbitkan dengan `pipeline.publish_model`: pickle, artefak
+gabungan, dan ekspor portabel diganti secara atomik.
+
+Contoh:
+    python -m churn.online data/churn_bulan_ini.csv
+    python -m churn.online data/churn_bulan_ini.csv --batch-size 500 --eta0 0.001 --dry-run
+"""
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+
+from churn import pipeline
+
+MODEL_NAME = 'logistic_regression'
+REPORT_FILE = 'logistic_regression_online_report.json'
+DEFAULT_BATCH_SIZE = 1_000
+DEFAULT_ALPHA = 1e-4
+DEFAULT_ETA0 = 0.001
+
+
+# --- Model Online ---
+def init_sgd(logreg, alpha=DEFAULT_ALPHA, eta0=DEFAULT_ETA0, random_state=42):
+    """`SGDClassifier` log-loss yang dimulai dari bobot `logreg` dan siap menerima `partial_fit`.
+
+    Mengisi `classes_`/`coef_`/`intercept_` sama dengan `fit(..., coef_init=, intercept_init=)` pada batch
+    pertama, tetapi tetap bekerja jika batch pertama hanya berisi satu kelas.
+    """
+    sgd = SGDClassifier(loss='log_loss', penalty='l2', alpha=alpha, learning_rate='constant', eta0=eta0,
+                        max_iter=1, tol=None, random_state=random_state)
+    sgd.classes_ = np.array([0, 1])
+    sgd.coef_ = np.array(logreg.coef_, dtype=np.float64, order='C')
+    sgd.intercept_ = np.array(logreg.intercept_, dtype=np.float64)
+    sgd.n_features_in_ = sgd.coef_.shape[1]
+    return sgd
+
+
+def to_logistic(sgd, logreg):
+    """Salinan `logreg` dengan bobot hasil SGD (keduanya model logistik, prediksinya identik)."""
+    updated = copy.deepcopy(logreg)
+    updated.coef_ = sgd.coef_.copy()
+    updated.intercept_ = sgd.intercept_.copy()
+    return updated
+
+
+def iter_labeled_batches(source, model_columns, scaler, batch_size=DEFAULT_BATCH_SIZE):
+    """(X ter-scale, y 0/1) per mini-batch dari CSV berlabel; baris tanpa label Yes/No dilewati."""
+    mean, scale = scaler.mean_, scaler.scale_
+    for chunk in pd.read_csv(source, chunksize=batch_size):
+        label = chunk['Churn'].astype(str).str.strip()
+        chunk = chunk[label.isin(['Yes', 'No'])]
+        if chunk.empty:
+            continue
+        X = pipeline.preprocess(chunk, model_columns)
+        X -= mean
+        X /= scale
+        yield X, (chunk['Churn'].str.strip() == 'Yes').to_numpy(dtype=int)
+
+
+def _log_loss_sum(sgd, X, y):
+    p = np.clip(sgd.predict_proba(X)[:, 1], 1e-15, 1 - 1e-15)
+    return float(-(y * np.log(p) + (1 - y) * np.log1p(-p)).sum())
+
+
+def update(logreg, batches, alpha=DEFAULT_ALPHA, eta0=DEFAULT_ETA0, balanced=True, random_state=42):
+    """Perbarui `logreg` dengan aliran (X, y); mengembalikan (LogisticRegression baru, ringkasan).
+
+    Dengan `balanced`, setiap kelas diberi bobot n / (2 * n_kelas) dari jumlah berjalan, seperti SMOTE yang
+    menyeimbangkan data latih awal; tanpa itu intercept perlahan bergeser mengikuti proporsi churn asli.
+    """
+    sgd = init_sgd(logreg, alpha, eta0, random_state)
+    counts = np.zeros(2)
+    rows = n_batches = 0
+    loss = correct = 0.0
+    for X, y in batches:
+        loss += _log_loss_sum(sgd, X, y)
+        correct += float((sgd.predict(X) == y).sum())
+        counts += np.bincount(y, minlength=2)
+        weight = None
+        if balanced:
+            class_weight = counts.sum() / (2 * np.maximum(counts, 1))
+            weight = class_weight[y]
+        sgd.partial_fit(X, y, sample_weight=weight)
+        rows += len(y)
+        n_batches += 1
+
+    if not rows:
+        raise ValueError("Tidak ada baris berlabel (kolom Churn berisi Yes/No) di data baru")
+    summary = {
+        'rows': rows,
+        'batches': n_batches,
+        'churn_rate': round(float(counts[1] / rows), 4),
+        'progressive_log_loss': round(loss / rows, 4),
+        'progressive_accuracy': round(correct / rows, 4),
+        'coef_change_l2': round(float(np.linalg.norm(sgd.coef_ - logreg.coef_)), 4),
+        'intercept_change': round(float(sgd.intercept_[0] - logreg.intercept_[0]), 4),
+    }
+    return to_logistic(sgd, logreg), summary
+
+
+# --- CLI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Perbarui Logistic Regression secara online dari data churn berlabel.")
+    parser.add_argument('input', help="CSV berformat Churn.csv dengan kolom Churn (Yes/No)")
+    parser.add_argument('--models-dir', default=pipeline.BASE_PATH)
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="Baris per mini-batch")
+    parser.add_argument('--alpha', type=float, default=DEFAULT_ALPHA, help="Kekuatan regularisasi L2")
+    parser.add_argument('--eta0', type=float, default=DEFAULT_ETA0, help="Learning rate (konstan)")
+    parser.add_argument('--no-balance', action='store_true', help="Jangan seimbangkan bobot kelas")
+    parser.add_argument('--random-state', type=int, default=42)
+    parser.add_argument('--dry-run', action='store_true', help="Hitung pembaruan tanpa menulis artefak")
+    args = parser.parse_args(argv)
+
+    logreg = pipeline.load_model(MODEL_NAME, args.models_dir)
+    scaler, model_columns = pipeline.load_preprocessors(args.models_dir)
+
+    start = time.perf_counter()
+    batches = iter_labeled_batches(args.input, model_columns, scaler, args.batch_size)
+    model, summary = update(logreg, batches, args.alpha, args.eta0, not args.no_balance, args.random_state)
+    summary['seconds'] = round(time.perf_counter() - start, 3)
+    summary['config'] = {'input': args.input, 'batch_size': args.batch_size, 'alpha': args.alpha, 'eta0': args.eta0,
+                         'balanced': not args.no_balance}
+    print(', '.join(f"{k}={v}" for k, v in summary.items() if k != 'config'))
+    if args.dry_run:
+        return 0
+
+    for path in pipeline.publish_model(MODEL_NAME, model, args.models_dir):
+        print(f"Artefak -> {path}")
+    report_path = os.path.join(args.models_dir, REPORT_FILE)
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+    print(f"Laporan -> {report_path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
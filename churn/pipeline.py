@@ -0,0 +1,164 @@
+"""Pra-pemrosesan dan skoring churn, sama persis dengan pipeline di Colab.
+
+Modul ini dipakai bersama oleh halaman Streamlit dan skrip batch
+(`python -m churn.score`), sehingga logika inferensi hanya ada di satu tempat.
+"""
+import functools
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from churn import portable, timing
+from churn.encoder import EncoderPlan
+from churn.fused import (DEFAULT_THRESHOLD, fuse, fused_path, load_fused_artifact, native_booster_path, save_fused,
+                         save_native_booster)
+
+BASE_PATH = 'saved_models'
+
+# Nama pendek model -> file pickle di folder saved_models
+MODEL_FILES = {
+    'xgboost': 'xgboost_churn_model.pkl',
+    'logistic_regression': 'logistic_regression_churn_model.pkl',
+    'random_forest': 'random_forest_churn_model.pkl',
+    'support_vector_machine': 'support_vector_machine_churn_model.pkl',
+    # Hasil `python -m churn.approx_svm` (Nyström/RFF + model linear)
+    'support_vector_machine_approx': 'support_vector_machine_approx_churn_model.pkl',
+}
+
+DEFAULT_CHUNKSIZE = 50_000
+
+
+# --- Muat Aset ---
+def load_model(name, base_path=BASE_PATH):
+    return joblib.load(os.path.join(base_path, MODEL_FILES[name]))
+
+
+def load_preprocessors(base_path=BASE_PATH):
+    scaler = joblib.load(os.path.join(base_path, 'scaler.pkl'))
+    model_columns = joblib.load(os.path.join(base_path, 'model_columns.pkl'))
+    return scaler, model_columns
+
+
+def available_models(base_path=BASE_PATH):
+    """Nama model yang bisa dimuat: ada di ekspor portabel, punya artefak gabungan, atau file .pkl beserta scaler."""
+    ada_preprocessor = all(os.path.exists(os.path.join(base_path, f)) for f in ('scaler.pkl', 'model_columns.pkl'))
+    portabel = portable.model_names(base_path)
+    return [
+        name for name, filename in MODEL_FILES.items()
+        if name in portabel
+        or os.path.exists(fused_path(name, base_path))
+        or (ada_preprocessor and os.path.exists(os.path.join(base_path, filename)))
+    ]
+
+
+def _load_fused(name, base_path):
+    if name in portable.model_names(base_path):
+        return portable.load_model(name, base_path)
+    path = fused_path(name, base_path)
+    if os.path.exists(path):
+        return load_fused_artifact(path)
+    scaler, model_columns = load_preprocessors(base_path)
+    return fuse(name, load_model(name, base_path), scaler, model_columns)
+
+
+def load_fused(name, base_path=BASE_PATH, sklearn_forest=False):
+    """Satu model siap pakai (scaler sudah digabung). Urutan sumber: ekspor portabel tanpa pickle
+    (`python -m churn.portable`), artefak `python -m churn.fused`, lalu file .pkl.
+
+    `sklearn_forest=True` ikut memuat pickle Random Forest agar batch besar (`FOREST_SKLEARN_MIN_ROWS` baris
+    ke atas) dinilai sklearn, yang ±2x lebih cepat per baris; biayanya ±50 MB memori privat per proses,
+    jadi hanya untuk skoring batch, bukan worker aplikasi. Model selain Random Forest tidak terpengaruh.
+    """
+    with timing.span('load', name):
+        model = _load_fused(name, base_path)
+        if sklearn_forest and model.kind == 'forest':
+            model.estimator = load_model(name, base_path)
+        return model
+
+
+# --- Publikasi Model ---
+def _dump_atomic(value, path):
+    # File sementara di folder yang sama lalu `os.replace`: pembaca melihat file lama atau baru, tidak setengah jadi
+    joblib.dump(value, f"{path}.tmp")
+    os.replace(f"{path}.tmp", path)
+    return path
+
+
+def save_model(name, model, base_path=BASE_PATH):
+    """Tulis pickle model secara atomik (file sementara lalu `os.replace`)."""
+    return _dump_atomic(model, os.path.join(base_path, MODEL_FILES[name]))
+
+
+def save_preprocessors(scaler, model_columns, base_path=BASE_PATH):
+    """Tulis `scaler.pkl` dan `model_columns.pkl` secara atomik (masing-masing satu file)."""
+    return [_dump_atomic(scaler, os.path.join(base_path, 'scaler.pkl')),
+            _dump_atomic(list(model_columns), os.path.join(base_path, 'model_columns.pkl'))]
+
+
+def publish_model(name, model, base_path=BASE_PATH):
+    """Ganti model yang ter-deploy dan semua turunannya; mengembalikan daftar file yang ditulis.
+
+    Pickle dan artefak gabungan selalu ditulis; booster native dan ekspor portabel hanya jika sudah ada.
+    Setiap sumber yang bisa dibaca `load_fused` beralih dalam satu langkah atomik: pickle, artefak gabungan,
+    dan booster native masing-masing satu file (file sementara lalu `os.replace`), sedangkan ekspor portabel
+    ditulis ke folder versi baru lalu diaktifkan dengan mengganti manifest. Pemuat selalu mendapat satu
+    versi yang utuh, lama atau baru (proses yang sudah berjalan tetap memakai model lama sampai dimuat ulang).
+    """
+    scaler, model_columns = load_preprocessors(base_path)
+    fused = fuse(name, model, scaler, model_columns)
+    paths = [save_model(name, model, base_path), save_fused(fused, base_path)]
+    if fused.booster is not None:
+        paths += [save_native_booster(fused, base_path, fmt) for fmt in ('ubj', 'json')
+                  if os.path.exists(native_booster_path(name, base_path, fmt))]
+    if name in portable.model_names(base_path) and fused.kind != 'pipeline':
+        paths.append(portable.export_portable([fused], base_path))
+    return paths
+
+
+# --- Pra-pemrosesan ---
+@functools.lru_cache(maxsize=8)
+def _encoder_for(columns):
+    return EncoderPlan(columns)
+
+
+def get_encoder(model_columns):
+    """EncoderPlan untuk model_columns; dibangun sekali lalu dipakai ulang."""
+    return _encoder_for(tuple(model_columns))
+
+
+def preprocess(df, model_columns):
+    """Ubah data mentah (format Churn.csv) menjadi matriks fitur float64 sesuai model_columns."""
+    return get_encoder(model_columns).transform(df)
+
+
+def preprocess_record(record, model_columns):
+    """Versi satu baris dari `preprocess` untuk input form (dict)."""
+    return get_encoder(model_columns).transform_record(record)
+
+
+# --- Skoring ---
+def predict_proba(df, model):
+    """Probabilitas [tidak churn, churn] untuk setiap baris data mentah (`model` dari `load_fused`)."""
+    return model.predict_proba(preprocess(df, model.model_columns))
+
+
+def score_frame(df, model, threshold=DEFAULT_THRESHOLD):
+    """Hasil prediksi ringkas (customerID, Prediksi, Prob_Churn) untuk satu DataFrame."""
+    label, proba = model.predict_label_proba(preprocess(df, model.model_columns), threshold)
+    return pd.DataFrame({
+        'customerID': df['customerID'] if 'customerID' in df.columns else df.index,
+        'Prediksi': np.where(label == 1, 'CHURN', 'TIDAK CHURN'),
+        'Prob_Churn': proba[:, 1].round(4)
+    })
+
+
+def iter_scored_chunks(source, model, chunksize=DEFAULT_CHUNKSIZE, threshold=DEFAULT_THRESHOLD):
+    """Baca `source` per chunk dan hasilkan DataFrame prediksi untuk setiap chunk.
+
+    Hanya satu chunk yang berada di memori pada satu waktu, sehingga pemakaian
+    memori tidak bergantung pada ukuran file.
+    """
+    for chunk in pd.read_csv(source, chunksize=chunksize):
+        yield score_frame(chunk, model, threshold)
@@ -0,0 +1,306 @@
+"""Format model portabel tanpa pickle: array NumPy + booster XGBoost JSON + manifest.
+
+Layout di `saved_models/portable/`:
+    manifest.json                    versi format, kolom model, parameter skalar, dan SHA-256 setiap file
+    <model>/<versi>/<array>.npy      array NumPy biasa (dimuat dengan allow_pickle=False, mmap_mode='r')
+    <model>/<versi>/booster.ubj      booster XGBoost dalam format native UBJSON (atau .json)
+
+Setiap ekspor menulis ke folder versi baru yang belum dirujuk siapa pun, lalu
+beralih dengan satu `os.replace` atas manifest.json. Pemuat selalu membaca
+manifest lebih dulu, sehingga ia melihat versi lama atau versi baru secara
+utuh, tidak pernah campuran keduanya. Satu versi sebelumnya dipertahankan
+untuk pemuat yang membaca manifest tepat sebelum peralihan; versi yang lebih
+tua dihapus.
+
+Memuat dari sini tidak mengeksekusi kode apa pun (hanya JSON dan .npy), tidak
+terikat ke versi sklearn/xgboost saat training di Colab, dan checksum setiap
+file diperiksa sebelum dipakai. Inferensinya memakai `FusedModel` yang sama,
+sehingga Logistic Regression, SVM RBF, SVM aproksimasi, dan Random Forest
+(array pohon ringkas) berjalan tanpa mengimpor sklearn. Estimator yang masih
+berupa objek sklearn (kind `pipeline`) belum bisa diekspor dan tetap dimuat
+dari artefak lama.
+
+Contoh:
+    python -m churn.portable
+    python -m churn.portable --xgb-format json
+    python -m churn.portable --verify
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+
+from churn.fused import FusedModel, load_booster
+
+FORMAT_VERSION = 1
+PORTABLE_DIR = 'portable'
+MANIFEST_FILE = 'manifest.json'
+
+# Atribut FusedModel yang disimpan: array -> .npy, skalar -> manifest, dict -> keduanya per key
+ARRAY_FIELDS = ('mean', 'scale', 'coef')
+SCALAR_FIELDS = ('intercept',)
+DICT_FIELDS = ('kernel', 'forest')
+
+
+class ChecksumError(ValueError):
+    """File artefak tidak cocok dengan checksum di manifest (rusak atau diganti)."""
+
+
+def portable_dir(base_path):
+    return os.path.join(base_path, PORTABLE_DIR)
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for blok in iter(lambda: f.read(1 << 20), b''):
+            h.update(blok)
+    return h.hexdigest()
+
+
+def _file_entry(root, rel):
+    return {'file': rel, 'sha256': _sha256(os.path.join(root, rel))}
+
+
+# --- Ekspor ---
+def _new_version():
+    return datetime.datetime.now().strftime('v%Y%m%d-%H%M%S-%f')
+
+
+def _write_array(root, rel, value):
+    # Folder versi masih baru dan belum dirujuk manifest, jadi file bisa ditulis langsung
+    value = np.ascontiguousarray(value)
+    with open(os.path.join(root, rel), 'wb') as f:
+        np.save(f, value, allow_pickle=False)
+    return {**_file_entry(root, rel), 'dtype': value.dtype.str, 'shape': list(value.shape)}
+
+
+def export_model(fused, root, xgb_format='ubj', version=None):
+    """Tulis satu FusedModel ke `root/<nama>/<versi>/` dan kembalikan entri manifest-nya.
+
+    Booster XGBoost default-nya UBJSON: sama-sama format native, tetapi dimuat jauh lebih cepat dari JSON.
+    """
+    if fused.kind == 'pipeline':
+        raise ValueError(f"{fused.name}: estimator {type(fused.estimator).__name__} belum punya format portabel")
+
+    folder = f"{fused.name}/{version or _new_version()}"
+    os.makedirs(os.path.join(root, folder))
+    entry = {'kind': fused.kind, 'model_columns': list(fused.model_columns), 'arrays': {}, 'params': {}}
+    for field in ARRAY_FIELDS:
+        value = getattr(fused, field)
+        if value is not None:
+            entry['arrays'][field] = _write_array(root, f"{folder}/{field}.npy", value)
+    for field in SCALAR_FIELDS:
+        value = getattr(fused, field)
+        if value is not None:
+            entry['params'][field] = float(value)
+    for field in DICT_FIELDS:
+        for key, value in (getattr(fused, field) or {}).items():
+            if isinstance(value, np.ndarray):
+                entry['arrays'][f"{field}.{key}"] = _write_array(root, f"{folder}/{field}.{key}.npy", value)
+            else:
+                entry['params'][f"{field}.{key}"] = value
+    if fused.booster is not None:
+        rel = f"{folder}/booster.{xgb_format}"
+        fused.booster.save_model(os.path.join(root, rel))
+        entry['booster'] = _file_entry(root, rel)
+    return entry
+
+
+def _versions():
+    versi = {'numpy': np.__version__}
+    try:
+        import xgboost
+        versi['xgboost'] = xgboost.__version__
+    except ImportError:
+        pass
+    return versi
+
+
+def _entry_files(entry):
+    files = {spec['file'] for spec in entry['arrays'].values()}
+    if 'booster' in entry:
+        files.add(entry['booster']['file'])
+    return files
+
+
+def _prune(root, name, keep):
+    """Hapus file model `name` yang tidak ada di `keep` (path relatif terhadap root), beserta folder kosongnya."""
+    model_root = os.path.join(root, name)
+    for dirpath, _, filenames in os.walk(model_root, topdown=False):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            if os.path.relpath(path, root).replace(os.sep, '/') not in keep:
+                try:
+                    os.remove(path)
+                except OSError:
+                    # Di Windows file yang masih di-mmap tidak bisa dihapus; dicoba lagi pada ekspor berikutnya
+                    pass
+        if dirpath != model_root and not os.listdir(dirpath):
+            os.rmdir(dirpath)
+
+
+def export_portable(models, base_path, xgb_format='ubj'):
+    """Ekspor FusedModel ke format portabel; entri model lain di manifest yang sudah ada dipertahankan.
+
+    Semua model ditulis ke folder versi baru dan baru terlihat setelah manifest.json diganti atomik.
+    """
+    root = portable_dir(base_path)
+    os.makedirs(root, exist_ok=True)
+    manifest = read_manifest(base_path) or {'models': {}}
+    sebelumnya = dict(manifest['models'])
+    version = _new_version()
+    for fused in models:
+        manifest['models'][fused.name] = export_model(fused, root, xgb_format, version)
+    manifest.update({
+        'format_version': FORMAT_VERSION,
+        'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'versions': _versions(),
+    })
+    path = os.path.join(root, MANIFEST_FILE)
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+    for fused in models:
+        keep = _entry_files(manifest['models'][fused.name])
+        if fused.name in sebelumnya:
+            keep |= _entry_files(sebelumnya[fused.name])
+        _prune(root, fused.name, keep)
+    return path
+
+
+# --- Impor ---
+def read_manifest(base_path):
+    """Isi manifest.json, atau None jika belum ada ekspor portabel."""
+    path = os.path.join(portable_dir(base_path), MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') != FORMAT_VERSION:
+        raise ValueError(
+            f"Versi format portabel {manifest.get('format_version')} tidak didukung (diharapkan {FORMAT_VERSION}). "
+            "Jalankan ulang `python -m churn.portable`."
+        )
+    return manifest
+
+
+def model_names(base_path):
+    manifest = read_manifest(base_path)
+    return list(manifest['models']) if manifest else []
+
+
+def _checked_path(root, spec, verify):
+    path = os.path.join(root, spec['file'])
+    if verify and _sha256(path) != spec['sha256']:
+        raise ChecksumError(f"Checksum {spec['file']} tidak cocok dengan manifest")
+    return path
+
+
+def _load_array(root, spec, verify, mmap_mode):
+    value = np.load(_checked_path(root, spec, verify), mmap_mode=mmap_mode, allow_pickle=False)
+    if value.dtype.str != spec['dtype'] or list(value.shape) != spec['shape']:
+        raise ChecksumError(f"{spec['file']}: dtype/shape {value.dtype.str}{list(value.shape)} tidak sesuai manifest")
+    return value
+
+
+def load_model(name, base_path, verify=True, mmap_mode='r'):
+    """FusedModel dari format portabel (tanpa pickle); checksum diperiksa jika `verify`."""
+    root = portable_dir(base_path)
+    manifest = read_manifest(base_path)
+    if manifest is None or name not in manifest['models']:
+        raise FileNotFoundError(f"Model {name} tidak ada di {os.path.join(root, MANIFEST_FILE)}")
+    entry = manifest['models'][name]
+
+    values = {key: _load_array(root, spec, verify, mmap_mode) for key, spec in entry['arrays'].items()}
+    values.update(entry['params'])
+    kwargs = {field: values.get(field) for field in ARRAY_FIELDS + SCALAR_FIELDS}
+    for field in DICT_FIELDS:
+        prefix = f"{field}."
+        isi = {key[len(prefix):]: value for key, value in values.items() if key.startswith(prefix)}
+        kwargs[field] = isi or None
+    if 'booster' in entry:
+        kwargs['booster'] = load_booster(_checked_path(root, entry['booster'], verify))
+    return FusedModel(name, entry['kind'], entry['model_columns'], **kwargs)
+
+
+def model_fingerprint(name, base_path):
+    """Hash entri manifest (berisi SHA-256 setiap file) untuk model ini; None jika tidak diekspor."""
+    manifest = read_manifest(base_path)
+    if manifest is None or name not in manifest['models']:
+        return None
+    # Tanpa path file: folder versi berganti setiap ekspor walau isinya sama
+    entry = json.loads(json.dumps(manifest['models'][name]))
+    for spec in list(entry['arrays'].values()) + [entry.get('booster', {})]:
+        spec.pop('file', None)
+    return hashlib.sha256(json.dumps(entry, sort_keys=True).encode()).hexdigest()[:16]
+
+
+# --- CLI ---
+def compare_with_source(portabel, base_path, data_path):
+    """Selisih probabilitas maksimum terhadap model yang dibangun dari pickle (None jika pickle tidak ada)."""
+    import pandas as pd
+
+    from churn import pipeline
+
+    try:
+        estimator = pipeline.load_model(portabel.name, base_path)
+        scaler, model_columns = pipeline.load_preprocessors(base_path)
+    except FileNotFoundError:
+        return None
+    sumber = pipeline.fuse(portabel.name, estimator, scaler, model_columns)
+    X = pipeline.preprocess(pd.read_csv(data_path), portabel.model_columns)
+    return float(np.abs(portabel.predict_proba(X) - sumber.predict_proba(X)).max())
+
+
+def main(argv=None):
+    from churn import pipeline
+
+    parser = argparse.ArgumentParser(description="Ekspor model churn ke format portabel tanpa pickle.")
+    parser.add_argument('--models-dir', default=pipeline.BASE_PATH, help="Folder berisi file .pkl")
+    parser.add_argument('--model', choices=sorted(pipeline.MODEL_FILES), action='append',
+                        help="Model yang diekspor (bisa diulang). Default: semua model yang tersedia.")
+    parser.add_argument('--xgb-format', choices=['ubj', 'json'], default='ubj', help="Format file booster XGBoost")
+    parser.add_argument('--verify', action='store_true',
+                        help="Jangan ekspor; periksa checksum dan bandingkan prediksi dengan model dari pickle")
+    parser.add_argument('--data', default=os.path.join('data', 'Churn.csv'), help="Data pembanding untuk --verify")
+    args = parser.parse_args(argv)
+
+    if args.verify:
+        for name in args.model or model_names(args.models_dir):
+            try:
+                portabel = load_model(name, args.models_dir)
+            except (ChecksumError, FileNotFoundError) as e:
+                print(f"- {name}: GAGAL - {e}")
+                continue
+            selisih = compare_with_source(portabel, args.models_dir, args.data)
+            print(f"- {name}: checksum OK" + (f", selisih probabilitas maks. terhadap pickle {selisih:.2e}"
+                                              if selisih is not None else " (pickle pembanding tidak ada)"))
+        return 0
+
+    scaler, model_columns = pipeline.load_preprocessors(args.models_dir)
+    models = []
+    for name in args.model or list(pipeline.MODEL_FILES):
+        try:
+            estimator = pipeline.load_model(name, args.models_dir)
+        except FileNotFoundError:
+            print(f"- {name}: dilewati, file {pipeline.MODEL_FILES[name]} tidak ditemukan")
+            continue
+        fused = pipeline.fuse(name, estimator, scaler, model_columns)
+        if fused.kind == 'pipeline':
+            print(f"- {name}: dilewati, {type(estimator).__name__} belum punya format portabel")
+            continue
+        models.append(fused)
+        print(f"- {name}: {fused.kind}")
+    if models:
+        print(f"Manifest -> {export_portable(models, args.models_dir, args.xgb_format)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
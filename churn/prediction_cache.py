@@ -0,0 +1,168 @@
+"""Cache prediksi berdasarkan vektor fitur hasil encoding.
+
+Pelanggan yang identik (preset isi cepat di halaman prediksi, profil duplikat
+di file batch) selalu menghasilkan vektor `EncoderPlan` yang sama persis,
+sehingga probabilitasnya cukup dihitung sekali. `CachedModel` membungkus
+`FusedModel` dengan antarmuka yang sama: baris duplikat dalam satu batch
+dinilai sekali lalu disebar kembali, dan hasilnya disimpan di LRU berbatas
+(dengan TTL) yang dipakai bersama oleh semua sesi dalam satu proses.
+
+Pencarian di cache berbiaya beberapa mikrodetik per baris unik, jadi hanya
+dilakukan untuk batch kecil (form, layanan HTTP); batch besar cukup
+dideduplikasi. Model linear tidak dibungkus sama sekali karena satu perkalian
+matriks lebih murah daripada deduplikasinya.
+"""
+import functools
+import itertools
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from churn.fused import DEFAULT_THRESHOLD
+
+DEFAULT_MAXSIZE = 50_000
+DEFAULT_TTL = 3600.0
+# Batch dengan baris unik lebih banyak dari ini hanya dideduplikasi, tidak dicari/disimpan di cache
+MAX_LOOKUP_ROWS = 4096
+
+# Penanda unik per model yang dibungkus: model yang dimuat ulang tidak pernah memakai entri model lama
+_tokens = itertools.count()
+
+
+class PredictionCache:
+    """LRU + TTL untuk probabilitas per (model, vektor fitur); aman dipakai dari banyak thread."""
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, ttl=DEFAULT_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        """Nilai tersimpan untuk setiap key (None jika tidak ada atau sudah kedaluwarsa)."""
+        now = time.monotonic()
+        hasil = []
+        with self._lock:
+            for key in keys:
+                item = self._items.get(key)
+                if item is not None and item[1] < now:
+                    del self._items[key]
+                    item = None
+                if item is None:
+                    self.misses += 1
+                    hasil.append(None)
+                else:
+                    self._items.move_to_end(key)
+                    self.hits += 1
+                    hasil.append(item[0])
+        return hasil
+
+    def put_many(self, keys, values):
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            for key, value in zip(keys, values):
+                self._items[key] = (value, expires)
+                self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._items),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 4) if total else None,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# Satu cache per proses, dipakai bersama oleh semua sesi Streamlit, skoring batch, dan layanan HTTP
+default_cache = PredictionCache()
+
+
+@functools.lru_cache(maxsize=8)
+def _hash_multipliers(n_features):
+    # Pengali ganjil acak (tetap) untuk hash baris 64-bit
+    return np.random.default_rng(0).integers(1, 2 ** 63, size=n_features, dtype=np.uint64) | np.uint64(1)
+
+
+def dedupe_rows(X):
+    """(indeks kemunculan pertama tiap baris unik, indeks baris unik untuk setiap baris X).
+
+    Baris di-hash sebagai bit float64 lalu dikelompokkan dengan `pd.factorize` (O(n)); hasilnya
+    diverifikasi sehingga tabrakan hash (sangat jarang) jatuh ke perbandingan bytes dengan `np.unique`.
+    """
+    if len(X) <= 1:
+        return np.arange(len(X)), np.zeros(len(X), dtype=np.int64)
+    h = (X.view(np.uint64) * _hash_multipliers(X.shape[1])).sum(axis=1)
+    inverse, _ = pd.factorize(h)
+    # Kode factorize diberikan menurut urutan kemunculan, jadi kemunculan pertama = posisi kode baru
+    first = np.flatnonzero(np.diff(np.maximum.accumulate(inverse), prepend=-1) > 0)
+    if not np.array_equal(X[first][inverse], X):
+        rows = X.view(np.dtype((np.void, X.dtype.itemsize * X.shape[1]))).ravel()
+        _, first, inverse = np.unique(rows, return_index=True, return_inverse=True)
+    return first, inverse.ravel()
+
+
+class CachedModel:
+    """`FusedModel` dengan memoisasi per baris; atribut lain (name, kind, model_columns, ...) diteruskan."""
+
+    def __init__(self, model, cache=None):
+        self.model = model
+        self.cache = cache if cache is not None else default_cache
+        self._token = next(_tokens)
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+    def predict_proba(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        first, inverse = dedupe_rows(X)
+        unique = X[first]
+        if len(unique) > MAX_LOOKUP_ROWS:
+            return self.model.predict_proba(unique)[inverse]
+
+        keys = [(self._token, row.tobytes()) for row in unique]
+        found = self.cache.get_many(keys)
+        proba = np.empty((len(unique), 2), dtype=np.float64)
+        missing = []
+        for i, value in enumerate(found):
+            if value is None:
+                missing.append(i)
+            else:
+                proba[i] = value
+        if missing:
+            proba[missing] = self.model.predict_proba(unique[missing])
+            self.cache.put_many([keys[i] for i in missing], [tuple(p) for p in proba[missing]])
+        return proba[inverse]
+
+    def predict_label_proba(self, X, threshold=DEFAULT_THRESHOLD):
+        proba = self.predict_proba(X)
+        return (proba[:, 1] >= threshold).astype(np.int64), proba
+
+    def predict(self, X, threshold=DEFAULT_THRESHOLD):
+        return self.predict_label_proba(X, threshold)[0]
+
+
+def cached(model, cache=None):
+    """Bungkus `model` dengan cache prediksi; model linear dikembalikan apa adanya."""
+    if model.kind == 'linear':
+        return model
+    return CachedModel(model, cache)
+
+
+def unwrap(model):
+    """Model asli di balik `CachedModel` (model lain dikembalikan apa adanya), untuk mengukur/menilai tanpa cache."""
+    return model.model if isinstance(model, CachedModel) else model
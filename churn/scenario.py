@@ -0,0 +1,58 @@
+"""Eksplorasi skenario (what-if) untuk satu pelanggan.
+
+Dari satu input form dibuat grid varian (tenure x Contract x PaymentMethod),
+langsung dalam bentuk matriks fitur: vektor hasil encoding pelanggan disalin
+ke seluruh grid lalu hanya kolom yang divariasikan yang ditimpa. Seluruh grid
+dinilai dengan satu pemanggilan `predict_proba` pada model aslinya: ratusan
+varian sekali pakai tidak dimasukkan ke cache prediksi bersama, sehingga tidak
+menggusur entri yang sering dipakai (mis. preset isi cepat).
+"""
+import numpy as np
+import pandas as pd
+
+from churn import pipeline, prediction_cache
+
+KONTRAK = ['Month-to-month', 'One year', 'Two year']
+METODE_PEMBAYARAN = ['Electronic check', 'Mailed check', 'Bank transfer (automatic)', 'Credit card (automatic)']
+TENURE_VALUES = np.arange(0, 73)
+
+
+def _set_category(X, encoder, kolom, levels, axis):
+    # Kosongkan semua kolom dummy fitur ini, lalu nyalakan level ke-j pada posisi j di sumbu `axis`.
+    # Level referensi (drop_first) tidak punya kolom, jadi cukup dibiarkan nol.
+    index = encoder.category_index[kolom]
+    X[..., list(index.values())] = 0.0
+    for j, level in enumerate(levels):
+        if level in index:
+            selector = [slice(None)] * (X.ndim - 1)
+            selector[axis] = j
+            X[tuple(selector) + (index[level],)] = 1.0
+
+
+def sweep(record, model, tenure_values=TENURE_VALUES, contracts=KONTRAK, payment_methods=METODE_PEMBAYARAN):
+    """Probabilitas churn untuk setiap kombinasi (tenure, Contract, PaymentMethod) dari satu pelanggan.
+
+    TotalCharges ikut disesuaikan menjadi tenure x MonthlyCharges agar varian tetap konsisten.
+    Mengembalikan array berbentuk (len(tenure_values), len(contracts), len(payment_methods)).
+    """
+    model = prediction_cache.unwrap(model)
+    encoder = pipeline.get_encoder(model.model_columns)
+    base = encoder.transform_record(record)[0]
+    tenure_values = np.asarray(tenure_values, dtype=np.float64)
+    shape = (len(tenure_values), len(contracts), len(payment_methods))
+
+    X = np.empty(shape + (encoder.n_features,), dtype=np.float64)
+    X[...] = base
+    X[..., encoder.numeric_index['tenure']] = tenure_values[:, None, None]
+    X[..., encoder.numeric_index['TotalCharges']] = tenure_values[:, None, None] * float(record['MonthlyCharges'])
+    _set_category(X, encoder, 'Contract', contracts, axis=1)
+    _set_category(X, encoder, 'PaymentMethod', payment_methods, axis=2)
+
+    return model.predict_proba(X.reshape(-1, encoder.n_features))[:, 1].reshape(shape)
+
+
+def to_frame(proba, tenure_values=TENURE_VALUES, contracts=KONTRAK, payment_methods=METODE_PEMBAYARAN):
+    """Hasil `sweep` dalam format panjang (tenure, Contract, PaymentMethod, Prob_Churn), mis. untuk diunduh."""
+    index = pd.MultiIndex.from_product([tenure_values, contracts, payment_methods],
+                                       names=['tenure', 'Contract', 'PaymentMethod'])
+    return pd.DataFrame({'Prob_Churn': np.asarray(proba).ravel().round(4)}, index=index).reset_index()
@@ -0,0 +1,67 @@
+"""Skoring churn tanpa browser.
+
+Contoh:
+    python -m churn.score data/Churn.csv hasil_prediksi.csv --model xgboost --chunksize 100000
+    python -m churn.score data/Churn.csv hasil_prediksi.csv --metrics metrics.prom
+    python -m churn.score data/Churn.csv hasil_prediksi.csv --model random_forest --sklearn-forest
+"""
+import argparse
+import sys
+import time
+
+from churn import pipeline, prediction_cache, timing
+
+
+def score_csv(input_path, output_path, model_name, chunksize=pipeline.DEFAULT_CHUNKSIZE, base_path=pipeline.BASE_PATH,
+              threshold=pipeline.DEFAULT_THRESHOLD, sklearn_forest=False):
+    # Profil pelanggan yang duplikat di dalam satu chunk hanya dinilai sekali
+    model = prediction_cache.cached(pipeline.load_fused(model_name, base_path, sklearn_forest))
+
+    total_rows = 0
+    start = time.perf_counter()
+    with open(output_path, 'w', newline='', encoding='utf-8') as output:
+        for i, hasil in enumerate(pipeline.iter_scored_chunks(input_path, model, chunksize, threshold)):
+            with timing.span('render'):
+                hasil.to_csv(output, header=(i == 0), index=False)
+            total_rows += len(hasil)
+    return total_rows, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='churn-score', description="Prediksi churn untuk file CSV berformat Churn.csv.")
+    parser.add_argument('input', help="File CSV input")
+    parser.add_argument('output', help="File CSV hasil prediksi")
+    parser.add_argument('--model', choices=sorted(pipeline.MODEL_FILES), default='xgboost')
+    parser.add_argument('--chunksize', type=int, default=pipeline.DEFAULT_CHUNKSIZE, help="Jumlah baris per chunk")
+    parser.add_argument('--threshold', type=float, default=pipeline.DEFAULT_THRESHOLD,
+                        help="Ambang Prob_Churn untuk label CHURN")
+    parser.add_argument('--models-dir', default=pipeline.BASE_PATH, help="Folder berisi file .pkl")
+    parser.add_argument('--sklearn-forest', action='store_true',
+                        help="Random Forest: muat juga pickle sklearn untuk chunk besar (lebih cepat, +±50 MB memori)")
+    parser.add_argument('--metrics', default=None,
+                        help="Ukur waktu per tahap lalu tulis metriknya (format teks Prometheus) ke file ini")
+    args = parser.parse_args(argv)
+
+    if args.metrics:
+        timing.enable()
+
+    try:
+        total_rows, elapsed = score_csv(
+            args.input, args.output, args.model, args.chunksize, args.models_dir, args.threshold, args.sklearn_forest
+        )
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    print(f"{total_rows:,} baris diproses dalam {elapsed:.2f} s ({total_rows / max(elapsed, 1e-9):,.0f} baris/detik) -> {args.output}")
+    if timing.is_enabled():
+        for item in timing.default_metrics.summary():
+            print(f"  {item['stage']:<8} {item['model'] or '-':<24} {item['count']:>6}x  {item['total_ms']:>10.1f} ms")
+    if args.metrics:
+        timing.default_metrics.write_prometheus(args.metrics)
+        print(f"Metrik -> {args.metrics}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,422 @@
+"""Layanan HTTP skoring churn (asyncio, tanpa dependensi tambahan).
+
+Model dimuat sekali saat start. Permintaan yang datang bersamaan untuk model
+yang sama dikumpulkan dalam jendela latensi singkat (`--max-wait-ms`) menjadi
+satu batch kecil, lalu encoding, scaling, dan `predict_proba` dijalankan
+sekali untuk seluruh batch di thread terpisah sehingga event loop tetap
+melayani koneksi lain.
+
+Endpoint:
+    POST /predict   body: satu record, list record, atau {"records": [...], "model": ..., "threshold": ...}
+    GET  /health    model yang dimuat
+    GET  /stats     throughput, latensi p50/p99, dan ukuran batch rata-rata
+    GET  /metrics   metrik format teks Prometheus (durasi per tahap dengan --timing)
+
+Contoh:
+    python -m churn.serve --port 8000
+    curl -s localhost:8000/predict -d '{"tenure": 1, "MonthlyCharges": 70.5, ...}'
+    python -m churn.serve --bench 5000 --concurrency 64
+    python -m churn.serve --timing && curl -s localhost:8000/metrics
+"""
+import argparse
+import asyncio
+import collections
+import json
+import os
+import sys
+import time
+import traceback
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from churn import pipeline, prediction_cache, timing
+from churn.encoder import check_record
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8000
+DEFAULT_MAX_BATCH = 64
+DEFAULT_MAX_WAIT_MS = 2.0
+MAX_BODY_BYTES = 10 * 2 ** 20
+LATENCY_WINDOW = 10_000
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large',
+           500: 'Internal Server Error'}
+
+
+class RequestError(Exception):
+    """Kesalahan input dari klien; dikembalikan sebagai respons JSON dengan status HTTP-nya."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_content_length(value):
+    """Nilai header Content-Length sebagai int >= 0; RequestError 400 bila tidak valid."""
+    if value is None or value == '':
+        return 0
+    if not (value.isascii() and value.isdigit()):
+        raise RequestError(400, f"Content-Length tidak valid: {value!r}")
+    return int(value)
+
+
+# --- Micro-batching ---
+class MicroBatcher:
+    """Antrian per model: record dari banyak permintaan dinilai bersama dalam satu pemanggilan model."""
+
+    def __init__(self, model, max_batch=DEFAULT_MAX_BATCH, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.model = model
+        self.encoder = pipeline.get_encoder(model.model_columns)
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1e3
+        self.queue = asyncio.Queue()
+        self.batches = 0
+        self.rows = 0
+
+    async def submit(self, records):
+        """Probabilitas churn untuk `records` (list dict); menunggu batch tempat record ini ikut dinilai."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((records, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self.queue.get()]
+            n_rows = len(items[0][0])
+            deadline = loop.time() + self.max_wait
+            while n_rows < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                items.append(item)
+                n_rows += len(item[0])
+
+            try:
+                hasil = await loop.run_in_executor(None, self._score, items, n_rows)
+            except Exception as e:
+                # Kegagalan tak terduga hanya menggagalkan batch ini; loop harus tetap hidup untuk permintaan berikutnya
+                hasil = [RequestError(500, f"Gagal menilai batch: {e}")] * len(items)
+            self.batches += 1
+            self.rows += n_rows
+            for (_, future), result in zip(items, hasil):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def _score(self, items, n_rows):
+        X = np.zeros((n_rows, self.encoder.n_features), dtype=np.float64)
+        valid = np.ones(n_rows, dtype=bool)
+        errors = []
+        start = 0
+        for records, _ in items:
+            error = None
+            for i, record in enumerate(records):
+                try:
+                    check_record(record)
+                    self.encoder.transform_record(record, out=X[start + i:start + i + 1])
+                except KeyError as e:
+                    error = RequestError(400, f"Record {i}: kolom {e.args[0]} tidak ada")
+                except Exception as e:
+                    # Termasuk OverflowError (angka di luar jangkauan float) dan TypeError/ValueError
+                    error = RequestError(400, f"Record {i}: {e}")
+            if error is not None:
+                valid[start:start + len(records)] = False
+            errors.append(error)
+            start += len(records)
+
+        proba = np.full(n_rows, np.nan)
+        if valid.any():
+            proba[valid] = self.model.predict_proba(X[valid])[:, 1]
+
+        hasil = []
+        start = 0
+        for (records, _), error in zip(items, errors):
+            hasil.append(error if error is not None else proba[start:start + len(records)])
+            start += len(records)
+        return hasil
+
+
+# --- Layanan HTTP ---
+class ScoringService:
+    def __init__(self, models, default_model, max_batch=DEFAULT_MAX_BATCH, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.models = models
+        self.default_model = default_model
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self.batchers = {}
+        self.latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self.requests = 0
+        self.started = time.perf_counter()
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        # Batcher dibuat di dalam event loop yang sama dengan server
+        for name, model in self.models.items():
+            batcher = MicroBatcher(model, self.max_batch, self.max_wait_ms)
+            self.batchers[name] = batcher
+            asyncio.get_running_loop().create_task(batcher.run())
+        return await asyncio.start_server(self.handle, host, port)
+
+    def stats(self):
+        elapsed = time.perf_counter() - self.started
+        lat = np.asarray(self.latencies) * 1e3
+        batches = sum(b.batches for b in self.batchers.values())
+        rows = sum(b.rows for b in self.batchers.values())
+        return {
+            'requests': self.requests,
+            'uptime_s': round(elapsed, 1),
+            'requests_per_s': round(self.requests / elapsed, 1) if elapsed else 0.0,
+            'p50_ms': round(float(np.percentile(lat, 50)), 3) if len(lat) else None,
+            'p99_ms': round(float(np.percentile(lat, 99)), 3) if len(lat) else None,
+            'batches': batches,
+            'mean_batch_rows': round(rows / batches, 2) if batches else None,
+            'cache': prediction_cache.default_cache.stats(),
+        }
+
+    def metrics(self):
+        """Histogram durasi per tahap ditambah counter layanan, dalam format teks Prometheus."""
+        cache = prediction_cache.default_cache.stats()
+        return timing.default_metrics.prometheus_text({
+            'churn_requests_total': ('counter', self.requests, 'Jumlah permintaan /predict yang berhasil.'),
+            'churn_batches_total': ('counter', sum(b.batches for b in self.batchers.values()),
+                                    'Jumlah batch yang dinilai model.'),
+            'churn_batch_rows_total': ('counter', sum(b.rows for b in self.batchers.values()),
+                                       'Jumlah record yang dinilai model.'),
+            'churn_cache_hits_total': ('counter', cache['hits'], 'Hit cache prediksi.'),
+            'churn_cache_misses_total': ('counter', cache['misses'], 'Miss cache prediksi.'),
+        })
+
+    async def predict(self, query, body):
+        try:
+            payload = json.loads(body or b'null')
+        except ValueError:
+            raise RequestError(400, "Body bukan JSON yang valid")
+
+        options = payload if isinstance(payload, dict) and 'records' in payload else {}
+        records = options.get('records', payload)
+        if isinstance(records, dict):
+            records = [records]
+        if not isinstance(records, list) or not records or not all(isinstance(r, dict) for r in records):
+            raise RequestError(400, "Kirim satu record (objek JSON), list record, atau {\"records\": [...]}")
+
+        name = query.get('model', [options.get('model', self.default_model)])[0]
+        if name not in self.batchers:
+            raise RequestError(404, f"Model tidak tersedia: {name}. Pilihan: {', '.join(self.batchers)}")
+        try:
+            threshold = float(query.get('threshold', [options.get('threshold', pipeline.DEFAULT_THRESHOLD)])[0])
+        except (TypeError, ValueError):
+            raise RequestError(400, "threshold harus berupa angka")
+
+        proba = await self.batchers[name].submit(records)
+        return {
+            'model': name,
+            'threshold': threshold,
+            'predictions': [
+                {
+                    'customerID': record.get('customerID'),
+                    'Prediksi': 'CHURN' if p >= threshold else 'TIDAK CHURN',
+                    'Prob_Churn': round(float(p), 4),
+                }
+                for record, p in zip(records, proba)
+            ],
+        }
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        if url.path == '/predict':
+            if method != 'POST':
+                raise RequestError(405, "Gunakan POST untuk /predict")
+            start = time.perf_counter()
+            hasil = await self.predict(query, body)
+            self.latencies.append(time.perf_counter() - start)
+            self.requests += 1
+            return hasil
+        if method != 'GET':
+            raise RequestError(405, f"Gunakan GET untuk {url.path}")
+        if url.path == '/health':
+            return {'status': 'ok', 'models': list(self.batchers), 'default_model': self.default_model}
+        if url.path == '/stats':
+            return self.stats()
+        if url.path == '/metrics':
+            return self.metrics()
+        raise RequestError(404, f"Endpoint tidak dikenal: {url.path}")
+
+    async def handle(self, reader, writer):
+        # HTTP/1.1 minimal dengan keep-alive: cukup untuk klien CRM dan curl
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                request_line, *header_lines = head.decode('latin-1').rstrip('\r\n').split('\r\n')
+                try:
+                    method, target, version = request_line.split(' ', 2)
+                except ValueError:
+                    break
+                headers = {}
+                for line in header_lines:
+                    key, _, value = line.partition(':')
+                    headers[key.strip().lower()] = value.strip()
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                length = None
+
+                try:
+                    length = parse_content_length(headers.get('content-length'))
+                    if length > MAX_BODY_BYTES:
+                        keep_alive = False
+                        raise RequestError(413, f"Body melebihi {MAX_BODY_BYTES // 2 ** 20} MB")
+                    body = await reader.readexactly(length)
+                    status, payload = 200, await self.dispatch(method, target, body)
+                except RequestError as e:
+                    if e.status == 400 and length is None:
+                        # Batas body tidak diketahui: sisa stream tidak bisa dibaca sebagai permintaan berikutnya
+                        keep_alive = False
+                    status, payload = e.status, {'error': str(e)}
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    raise
+                except Exception:
+                    # Bug di sisi server: catat ke stderr dan tetap jawab klien daripada memutus koneksi diam-diam
+                    print(f"Error saat melayani {method} {target}:", file=sys.stderr)
+                    traceback.print_exc()
+                    keep_alive = False
+                    status, payload = 500, {'error': "Kesalahan internal server"}
+
+                with timing.span('render'):
+                    if isinstance(payload, str):
+                        data, content_type = payload.encode(), 'text/plain; version=0.0.4'
+                    else:
+                        data, content_type = json.dumps(payload).encode(), 'application/json'
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def load_service(names=None, base_path=pipeline.BASE_PATH, max_batch=DEFAULT_MAX_BATCH, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+    names = names or pipeline.available_models(base_path)
+    if not names:
+        raise FileNotFoundError(f"Tidak ada model di {base_path}")
+    # Record identik (mis. pelanggan yang sama dinilai berulang oleh CRM) diambil dari cache prediksi
+    models = {name: prediction_cache.cached(pipeline.load_fused(name, base_path)) for name in names}
+    default_model = 'xgboost' if 'xgboost' in models else names[0]
+    return ScoringService(models, default_model, max_batch, max_wait_ms)
+
+
+# --- Uji Beban ---
+async def _client(host, port, bodies, latencies, counter):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while counter[0] > 0:
+            counter[0] -= 1
+            body = bodies[counter[0] % len(bodies)]
+            start = time.perf_counter()
+            writer.write(
+                f"POST /predict HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+            head = await reader.readuntil(b'\r\n\r\n')
+            length = int(head.lower().split(b'content-length:')[1].split(b'\r\n')[0])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def run_benchmark(service, data_path, n_requests, concurrency, host=DEFAULT_HOST):
+    """Jalankan layanan di port acak lalu kirim `n_requests` permintaan satu-record dari `concurrency` koneksi."""
+    server = await service.start(host, 0)
+    port = server.sockets[0].getsockname()[1]
+    sample = pd.read_csv(data_path, nrows=1000)
+    bodies = [json.dumps(r).encode() for r in json.loads(sample.to_json(orient='records'))]
+
+    latencies = []
+    counter = [n_requests]
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, bodies, latencies, counter) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    server.close()
+
+    lat = np.asarray(latencies) * 1e3
+    return {
+        'requests': len(latencies),
+        'concurrency': concurrency,
+        'requests_per_s': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(float(np.percentile(lat, 50)), 3),
+        'p99_ms': round(float(np.percentile(lat, 99)), 3),
+        'mean_batch_rows': service.stats()['mean_batch_rows'],
+    }
+
+
+async def _serve(service, host, port):
+    server = await service.start(host, port)
+    print(f"Layanan skoring di http://{host}:{port} (model: {', '.join(service.models)}, "
+          f"default {service.default_model}, batch <= {service.max_batch}, jendela {service.max_wait_ms} ms)")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Layanan HTTP skoring churn dengan micro-batching.")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--models-dir', default=pipeline.BASE_PATH)
+    parser.add_argument('--model', choices=sorted(pipeline.MODEL_FILES), action='append',
+                        help="Model yang dimuat (bisa diulang). Default: semua model yang tersedia.")
+    parser.add_argument('--max-batch', type=int, default=DEFAULT_MAX_BATCH, help="Jumlah record maksimum per batch")
+    parser.add_argument('--max-wait-ms', type=float, default=DEFAULT_MAX_WAIT_MS,
+                        help="Lama maksimum menunggu permintaan lain sebelum batch dijalankan")
+    parser.add_argument('--bench', type=int, metavar='N', default=None,
+                        help="Uji beban: kirim N permintaan ke layanan lokal lalu laporkan throughput dan p99")
+    parser.add_argument('--concurrency', type=int, default=64, help="Jumlah koneksi paralel untuk --bench")
+    parser.add_argument('--data', default=os.path.join('data', 'Churn.csv'), help="Sumber record untuk --bench")
+    parser.add_argument('--timing', action='store_true',
+                        help="Ukur durasi per tahap (encode, scale, predict, render) untuk /metrics")
+    args = parser.parse_args(argv)
+
+    if args.timing:
+        timing.enable()
+
+    try:
+        service = load_service(args.model, args.models_dir, args.max_batch, args.max_wait_ms)
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if args.bench:
+        hasil = asyncio.run(run_benchmark(service, args.data, args.bench, args.concurrency, args.host))
+        print(f"{hasil['requests']:,} permintaan, {hasil['concurrency']} koneksi: {hasil['requests_per_s']:,.0f} req/s, "
+              f"p50 {hasil['p50_ms']:.2f} ms, p99 {hasil['p99_ms']:.2f} ms, rata-rata {hasil['mean_batch_rows']} record/batch")
+        for item in timing.default_metrics.summary():
+            print(f"  {item['stage']:<8} {item['model'] or '-':<24} {item['count']:>7}x  rata-rata {item['mean_ms']:.3f} ms")
+        return 0
+
+    try:
+        asyncio.run(_serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
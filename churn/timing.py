@@ -0,0 +1,181 @@
+"""Span waktu per tahap jalur prediksi dan ekspor metrik format Prometheus.
+
+Tahap yang diukur:
+    load     memuat artefak model (`pipeline.load_fused`)
+    encode   parsing kolom numerik dari data mentah
+    align    one-hot kategori langsung ke posisi `model_columns`
+    scale    standardisasi (tidak ada untuk model linear: scaler sudah dilebur ke koefisien)
+    predict  inferensi model
+    render   menampilkan/menulis hasil (halaman Streamlit, CSV batch, respons JSON)
+
+Nonaktif secara default: `span()` lalu mengembalikan context manager kosong
+yang sama setiap kali, sehingga biayanya hanya satu pemanggilan fungsi.
+Aktifkan untuk seluruh proses dengan variabel lingkungan `CHURN_TIMING=1` atau
+`enable()`. Trace (`start_trace()`) hanya berlaku untuk thread pemanggilnya:
+selama trace aktif span tetap diukur walau flag global mati, sehingga satu
+sesi Streamlit bisa men-debug tanpa menyalakan pengukuran untuk sesi lain.
+Worker pool ikut mencatat ke trace pemanggil lewat `use_trace()`.
+
+Contoh:
+    CHURN_TIMING=1 python -m churn.score data/Churn.csv hasil.csv --metrics metrics.prom
+    python -m churn.serve --timing   # lalu: curl -s localhost:8000/metrics
+"""
+import bisect
+import contextlib
+import os
+import threading
+import time
+
+STAGES = ('load', 'encode', 'align', 'scale', 'predict', 'render')
+# Batas atas bucket histogram (detik): dari mikrodetik (satu record) sampai beberapa detik (1M baris)
+BUCKETS = (1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ('metrics', 'stage', 'model', 'start')
+
+    def __init__(self, metrics, stage, model):
+        self.metrics = metrics
+        self.stage = stage
+        self.model = model
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.stage, time.perf_counter() - self.start, self.model)
+        return False
+
+
+class StageMetrics:
+    """Histogram durasi per (tahap, model), aman dipakai dari banyak thread."""
+
+    def __init__(self, enabled=False, buckets=BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def span(self, stage, model=''):
+        """Context manager yang mengukur satu tahap; tanpa biaya berarti saat nonaktif."""
+        if not self.enabled and getattr(self._local, 'trace', None) is None:
+            return _NOOP
+        return _Span(self, stage, model)
+
+    def observe(self, stage, seconds, model=''):
+        with self._lock:
+            series = self._series.get((stage, model))
+            if series is None:
+                series = self._series[(stage, model)] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][bisect.bisect_left(self.buckets, seconds)] += 1
+            series[1] += seconds
+        trace = getattr(self._local, 'trace', None)
+        if trace is not None:
+            trace.append((stage, model, seconds))
+
+    def start_trace(self):
+        """Mulai mengumpulkan span (tahap, model, detik) dari thread ini; list yang dikembalikan terus terisi."""
+        spans = []
+        self._local.trace = spans
+        return spans
+
+    def stop_trace(self):
+        self._local.trace = None
+
+    def current_trace(self):
+        """Trace aktif di thread ini (None jika tidak ada), untuk diteruskan ke worker lewat `use_trace`."""
+        return getattr(self._local, 'trace', None)
+
+    @contextlib.contextmanager
+    def use_trace(self, trace):
+        """Catat span thread ini ke `trace` (mis. milik thread pemanggil sebuah pool), lalu pulihkan yang lama."""
+        previous = self.current_trace()
+        self._local.trace = trace
+        try:
+            yield trace
+        finally:
+            self._local.trace = previous
+
+    def recording(self):
+        """True jika span di thread ini diukur: flag global aktif atau ada trace."""
+        return self.enabled or self.current_trace() is not None
+
+    def summary(self):
+        """Ringkasan per (tahap, model): jumlah, total, dan rata-rata dalam milidetik."""
+        with self._lock:
+            items = [(key, sum(counts), total) for key, (counts, total) in self._series.items()]
+        urutan = {stage: i for i, stage in enumerate(STAGES)}
+        return [
+            {'stage': stage, 'model': model, 'count': count, 'total_ms': total * 1e3, 'mean_ms': total * 1e3 / count}
+            for (stage, model), count, total in sorted(items, key=lambda x: (urutan.get(x[0][0], len(urutan)), x[0][1]))
+        ]
+
+    def prometheus_text(self, extra=None):
+        """Histogram `churn_stage_duration_seconds` dalam format teks Prometheus.
+
+        `extra` (opsional): dict nama metrik -> (tipe, nilai, help) untuk counter/gauge tambahan.
+        """
+        with self._lock:
+            series = {key: (list(counts), total) for key, (counts, total) in self._series.items()}
+        lines = [
+            '# HELP churn_stage_duration_seconds Durasi per tahap jalur prediksi churn.',
+            '# TYPE churn_stage_duration_seconds histogram',
+        ]
+        for (stage, model), (counts, total) in sorted(series.items()):
+            labels = f'stage="{stage}",model="{model}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'churn_stage_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f'churn_stage_duration_seconds_sum{{{labels}}} {total!r}')
+            lines.append(f'churn_stage_duration_seconds_count{{{labels}}} {cumulative}')
+        for name, (kind, value, help_text) in (extra or {}).items():
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}', f'{name} {value}']
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path, extra=None):
+        """Tulis metrik secara atomik (cocok untuk textfile collector node_exporter)."""
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text(extra))
+        os.replace(tmp, path)
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+ENV_ENABLED = os.environ.get('CHURN_TIMING', '') not in ('', '0')
+
+# Satu registry per proses, dipakai bersama oleh halaman Streamlit, skoring batch, dan layanan HTTP
+default_metrics = StageMetrics(enabled=ENV_ENABLED)
+
+
+# Alias langsung (tanpa fungsi pembungkus) agar span yang nonaktif semurah mungkin di jalur per-record
+span = default_metrics.span
+
+
+def enable(enabled=True):
+    default_metrics.enabled = enabled
+
+
+def is_enabled():
+    return default_metrics.enabled
+
+
+def is_recording():
+    return default_metrics.recording()
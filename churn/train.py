@@ -0,0 +1,270 @@
+"""Pipeline pelatihan yang dapat dijalankan ulang, pengganti langkah manual di notebook Colab.
+
+Langkah data sama persis dengan `Project_Customer_Churn.ipynb`: koersi + median
+`TotalCharges`, buang `customerID`/`gender`/`PhoneService`, hapus duplikat,
+normalisasi nilai layanan, `get_dummies`, split stratified 80/20,
+`StandardScaler`, lalu SMOTE. Matriks hasil pra-pemrosesan disimpan di cache
+(berdasarkan hash file data + parameter) dan keempat model dilatih paralel di
+beberapa proses.
+
+Scaler dan `model_columns` dipakai bersama oleh semua model, jadi pelatihan
+sebagian (`--model`) ditolak jika data baru menghasilkan scaler yang berbeda
+sementara model lain di folder tujuan masih memakai scaler lama.
+
+Contoh:
+    python -m churn.train --data data/Churn.csv --output saved_models --jobs 4
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+
+from churn import dataset, pipeline
+
+CACHE_DIR = os.path.join('.cache', 'churn_train')
+METRICS_FILE = 'metrics.json'
+PREPROCESS_VERSION = 2
+
+
+# --- Definisi Model (parameter sama dengan notebook) ---
+def build_model(name, random_state=42):
+    if name == 'logistic_regression':
+        return LogisticRegression(random_state=random_state)
+    if name == 'random_forest':
+        return RandomForestClassifier(random_state=random_state)
+    if name == 'support_vector_machine':
+        return SVC(kernel='rbf', probability=True, random_state=random_state)
+    if name == 'xgboost':
+        import xgboost as xgb
+        return xgb.XGBClassifier(
+            n_estimators=100,
+            learning_rate=0.1,
+            max_depth=5,
+            subsample=0.8,
+            colsample_bytree=0.8,
+            eval_metric='logloss',
+            random_state=random_state
+        )
+    raise ValueError(f"Model tidak dikenal: {name}")
+
+
+TRAINABLE_MODELS = ['logistic_regression', 'random_forest', 'support_vector_machine', 'xgboost']
+
+
+# --- Pra-pemrosesan ---
+def _ganti_nilai(s, lama, baru):
+    # Berlaku untuk kolom object maupun category (kategori lama dibuang agar get_dummies tidak membuat kolom kosong)
+    s = s.where(s != lama, baru)
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        s = s.cat.remove_unused_categories()
+    return s
+
+
+def clean_dataframe(df):
+    """Pembersihan data seperti di notebook; mengembalikan (X mentah setelah normalisasi, y 0/1)."""
+    df = df.copy()
+    df['TotalCharges'] = pd.to_numeric(df['TotalCharges'], errors='coerce')
+    df['TotalCharges'] = df['TotalCharges'].fillna(df['TotalCharges'].median())
+    df = df.drop(columns=[c for c in ['customerID', 'gender', 'PhoneService'] if c in df.columns])
+    df = df.drop_duplicates()
+
+    for kolom in ["OnlineSecurity", "OnlineBackup", "DeviceProtection", "TechSupport", "StreamingTV", "StreamingMovies"]:
+        df[kolom] = _ganti_nilai(df[kolom], "No internet service", "No")
+    df["MultipleLines"] = _ganti_nilai(df["MultipleLines"], "No phone service", "No")
+
+    y = (df.pop('Churn') == 'Yes').astype(int).to_numpy()
+    return df, y
+
+
+def prepare_data(csv_path, test_size=0.2, random_state=42):
+    from imblearn.over_sampling import SMOTE
+
+    # Kolom kategori hemat memori, tetapi biaya tetap float64: pembulatan float32 menggeser
+    # nilai split/scaler sehingga model tidak lagi identik dengan hasil notebook
+    X, y = clean_dataframe(dataset.read_csv_typed(csv_path, float_dtype='float64'))
+    X_encoded = pd.get_dummies(X, drop_first=True, dtype=float)
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X_encoded, y, test_size=test_size, random_state=random_state, stratify=y
+    )
+    model_columns = list(X_train.columns)
+
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+    X_test_scaled = scaler.transform(X_test)
+    X_resampled, y_resampled = SMOTE(random_state=random_state).fit_resample(X_train_scaled, y_train)
+
+    return {
+        'model_columns': model_columns,
+        'scaler': scaler,
+        'X_resampled': X_resampled,
+        'y_resampled': y_resampled,
+        'X_test': np.ascontiguousarray(X_test.to_numpy(dtype=np.float64)),
+        'X_test_scaled': X_test_scaled,
+        'y_test': y_test,
+    }
+
+
+def _cache_key(csv_path, test_size, random_state):
+    h = hashlib.sha256()
+    with open(csv_path, 'rb') as f:
+        for blok in iter(lambda: f.read(1 << 20), b''):
+            h.update(blok)
+    h.update(f"{PREPROCESS_VERSION}|{test_size}|{random_state}".encode())
+    return h.hexdigest()[:16]
+
+
+def load_prepared(csv_path, test_size=0.2, random_state=42, cache_dir=CACHE_DIR):
+    """`prepare_data` dengan cache di disk; dihitung ulang hanya jika data/parameter berubah."""
+    if cache_dir is None:
+        return prepare_data(csv_path, test_size, random_state)
+
+    path = os.path.join(cache_dir, f"{_cache_key(csv_path, test_size, random_state)}.joblib")
+    if os.path.exists(path):
+        return joblib.load(path)
+
+    data = prepare_data(csv_path, test_size, random_state)
+    os.makedirs(cache_dir, exist_ok=True)
+    joblib.dump(data, path)
+    return data
+
+
+# --- Pelatihan & Evaluasi ---
+def evaluate(name, model, data, threshold=pipeline.DEFAULT_THRESHOLD):
+    """Metrik uji dengan jalur skoring aplikasi (`FusedModel`, `Prob_Churn >= threshold`), sama dengan
+    `churn.evaluate`, sehingga metrics.json dan evaluation.json tidak pernah berbeda untuk model yang sama."""
+    # Diimpor di sini: churn.evaluate sendiri mengimpor modul ini untuk `load_prepared`
+    from churn.evaluate import score_model
+
+    fused = pipeline.fuse(name, model, data['scaler'], data['model_columns'])
+    return score_model(fused, data['X_test'], data['y_test'], threshold)[0]
+
+
+def _train_one(name, data, random_state, threshold):
+    start = time.perf_counter()
+    model = build_model(name, random_state)
+    model.fit(data['X_resampled'], data['y_resampled'])
+    seconds = time.perf_counter() - start
+    metrics = evaluate(name, model, data, threshold)
+    metrics['train_seconds'] = round(seconds, 2)
+    return name, model, metrics
+
+
+def train_models(data, names, jobs=None, random_state=42, threshold=pipeline.DEFAULT_THRESHOLD):
+    """Latih model paralel (satu proses per model); menghasilkan dict nama -> (model, metrik)."""
+    args = (data, random_state, threshold)
+    hasil = {}
+    with ProcessPoolExecutor(max_workers=jobs or min(len(names), os.cpu_count() or 1)) as executor:
+        futures = [executor.submit(_train_one, name, *args) for name in names]
+        for future in as_completed(futures):
+            name, model, metrics = future.result()
+            print(f"- {name}: F1 churn {metrics['f1_churn']:.4f}, akurasi {metrics['accuracy']:.4f} "
+                  f"({metrics['train_seconds']:.1f} s)")
+            hasil[name] = (model, metrics)
+    return hasil
+
+
+def _same_preprocessors(data, output_dir):
+    """True/False jika scaler/kolom di `output_dir` sama/berbeda dengan hasil data ini; None jika belum ada."""
+    try:
+        scaler, model_columns = pipeline.load_preprocessors(output_dir)
+    except FileNotFoundError:
+        return None
+    return (list(model_columns) == list(data['model_columns'])
+            and np.array_equal(scaler.mean_, data['scaler'].mean_)
+            and np.array_equal(scaler.scale_, data['scaler'].scale_))
+
+
+def conflicting_models(data, names, output_dir):
+    """Model ter-deploy di luar `names` yang akan memakai scaler/kolom yang salah jika hasil pelatihan ini ditulis.
+
+    Kosong jika scaler dan model_columns baru sama persis dengan yang ada (data dan parameter split sama).
+    """
+    lain = [name for name in pipeline.available_models(output_dir) if name not in names]
+    if not lain or _same_preprocessors(data, output_dir) is not False:
+        return []
+    return lain
+
+
+def _conflict_message(lain, output_dir):
+    return (f"scaler/model_columns hasil data ini berbeda dengan yang dipakai {', '.join(lain)} di {output_dir}. "
+            "Latih ulang model tersebut juga (tanpa --model; SVM aproksimasi lewat `python -m churn.approx_svm`) "
+            "atau tulis ke --output lain.")
+
+
+def save_artifacts(data, hasil, output_dir):
+    """Tulis scaler/model_columns lalu terbitkan setiap model (`pipeline.publish_model`), semuanya atomik.
+
+    Ditolak (ValueError) jika scaler/kolom baru berbeda dan masih ada model lain yang tidak ikut dilatih ulang.
+    """
+    lain = conflicting_models(data, hasil, output_dir)
+    if lain:
+        raise ValueError(_conflict_message(lain, output_dir))
+    os.makedirs(output_dir, exist_ok=True)
+    # Scaler/kolom yang sama tidak ditulis ulang, agar sidik jari model lain (evaluation.json) tidak ikut berubah
+    if not _same_preprocessors(data, output_dir):
+        pipeline.save_preprocessors(data['scaler'], data['model_columns'], output_dir)
+    for name, (model, _) in hasil.items():
+        # Artefak gabungan, booster native, dan ekspor portabel lama akan basi setelah retraining,
+        # jadi semuanya diterbitkan ulang bersama pickle-nya
+        pipeline.publish_model(name, model, output_dir)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latih ulang model churn dan tulis artefak ke saved_models.")
+    parser.add_argument('--data', default=os.path.join('data', 'Churn.csv'))
+    parser.add_argument('--output', default=pipeline.BASE_PATH, help="Folder tujuan artefak")
+    parser.add_argument('--model', choices=TRAINABLE_MODELS, action='append',
+                        help="Model yang dilatih (bisa diulang). Default: keempat model.")
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--random-state', type=int, default=42)
+    parser.add_argument('--threshold', type=float, default=pipeline.DEFAULT_THRESHOLD,
+                        help="Ambang Prob_Churn untuk label CHURN pada metrik uji")
+    parser.add_argument('--jobs', type=int, default=None, help="Jumlah proses paralel")
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--no-cache', action='store_true', help="Selalu hitung ulang pra-pemrosesan")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    data = load_prepared(args.data, args.test_size, args.random_state, None if args.no_cache else args.cache_dir)
+    print(f"Data siap: {len(data['X_resampled']):,} baris latih (SMOTE), {len(data['y_test']):,} baris uji "
+          f"({time.perf_counter() - start:.2f} s)")
+
+    names = args.model or TRAINABLE_MODELS
+    # Diperiksa sebelum pelatihan agar tidak membuang waktu melatih model yang tidak bisa diterbitkan
+    lain = conflicting_models(data, names, args.output)
+    if lain:
+        print(f"Error: {_conflict_message(lain, args.output)}", file=sys.stderr)
+        return 1
+    hasil = train_models(data, names, args.jobs, args.random_state, args.threshold)
+    save_artifacts(data, hasil, args.output)
+
+    metrics = {
+        'data': args.data,
+        'test_size': args.test_size,
+        'random_state': args.random_state,
+        'threshold': args.threshold,
+        'models': {name: hasil[name][1] for name in names},
+    }
+    metrics_path = os.path.join(args.output, METRICS_FILE)
+    with open(metrics_path, 'w', encoding='utf-8') as f:
+        json.dump(metrics, f, indent=2)
+
+    print(f"Artefak -> {args.output}, metrik -> {metrics_path} (total {time.perf_counter() - start:.1f} s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,8 +2,11 @@ import streamlit as st
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
+import numpy as np
 import os
 
+from churn import dataset, eda, figures
+
 # Atur tema Streamlit (opsional)
 st.set_page_config(
     page_title="Gambaran Dataset",
@@ -25,57 +28,100 @@ st.write(
 )
 
 # --- Fungsi untuk Memuat Data ---
-@st.cache_data
-def load_data(file_path):
+@st.cache_data(show_spinner="Menghitung agregat dataset...")
+def load_aggregates(file_path, source_key):
+    # Semua grafik dirender dari agregat kecil (jumlah per level, histogram ber-bin tetap),
+    # bukan dari seluruh baris; lihat churn/eda.py. `source_key` membuat cache basi saat file berubah.
+    return eda.load_aggregates(file_path)
+
+def stream_aggregates(file_path, placeholder):
+    # File besar tidak dimuat utuh: agregasi per chunk, metrik diperbarui setiap chunk selesai
+    progress = st.progress(0.0, text="Membaca dataset per chunk...")
+    for agg, fraksi in eda.iter_aggregates(file_path):
+        progress.progress(fraksi, text=f"Membaca dataset per chunk... {agg['n_rows']:,} baris ({fraksi:.0%})")
+        with placeholder.container():
+            show_metrics(agg)
+    progress.empty()
+    eda.save_aggregates(agg, file_path)
+
+def load_data(file_path, placeholder):
     try:
-        return pd.read_csv(file_path)
+        key = dataset.source_key(file_path)
     except FileNotFoundError:
         st.error(f"File tidak ditemukan di {file_path}. Pastikan file 'Churn.csv' ada di folder 'data'.")
         return None
+    if not os.path.exists(eda.aggregate_path(file_path)) and os.path.getsize(file_path) > eda.STREAM_THRESHOLD_BYTES:
+        stream_aggregates(file_path, placeholder)
+    return load_aggregates(file_path, key)
 
-# Muat data
-data_path = os.path.join('data', 'Churn.csv')
-df = load_data(data_path)
+def show_metrics(agg):
+    total = agg['n_rows']
+    churn_count = eda.churn_count(agg, 'Yes')
+    non_churn_count = eda.churn_count(agg, 'No')
 
-if df is not None:
-    # --- Informasi Dataset ---
     st.markdown("### 📋 Informasi Dataset")
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
         st.metric(
             label="Total Pelanggan",
-            value=f"{df.shape[0]:,}",
+            value=f"{total:,}",
             help="Jumlah total baris (pelanggan) pada dataset"
         )
     with col2:
         st.metric(
             label="Total Fitur",
-            value=df.shape[1],
+            value=len(agg['columns']),
             help="Jumlah kolom (fitur) pada dataset"
         )
     with col3:
-        churn_count = df['Churn'].value_counts().get('Yes', 0)
-        churn_pct = (churn_count / len(df)) * 100
         st.metric(
             label="Pelanggan Churn",
-            value=f"{churn_count:,} ({churn_pct:.1f}%)",
+            value=f"{churn_count:,} ({churn_count / total * 100:.1f}%)",
             help="Jumlah dan persentase pelanggan yang churn"
         )
     with col4:
-        non_churn_count = df['Churn'].value_counts().get('No', 0)
-        non_churn_pct = (non_churn_count / len(df)) * 100
         st.metric(
             label="Pelanggan Setia",
-            value=f"{non_churn_count:,} ({non_churn_pct:.1f}%)",
+            value=f"{non_churn_count:,} ({non_churn_count / total * 100:.1f}%)",
             help="Jumlah dan persentase pelanggan yang tetap (tidak churn)"
         )
 
+def plot_histogram(ax, agg, column):
+    # Histogram + kurva KDE dari bin yang sudah diagregasi (pengganti sns.histplot(kde=True))
+    edges, counts, kde_x, kde = eda.histogram(agg, column, bins=20)
+    for j, (level, color) in enumerate(zip(agg['churn_levels'], ['#2E86AB', '#A23B72'])):
+        ax.bar(edges[:-1], counts[:, j], width=np.diff(edges), align='edge',
+               color=color, alpha=0.8, edgecolor='white', linewidth=0.5, label=level)
+        ax.plot(kde_x, kde[:, j], color=color, linewidth=1.5)
+    ax.legend(title='Churn')
+    ax.set_ylabel('Count')
+
+def show_chart(data_key, chart_id, draw):
+    # Grafik dirender sekali per (hash dataset, id grafik, tema) lalu disajikan dari cache bytes PNG
+    theme = st.context.theme.type or 'light'
+    st.image(figures.cached_figure((data_key, chart_id, theme), draw), use_container_width=True)
+
+# Muat data
+data_path = os.path.join('data', 'Churn.csv')
+metrics_placeholder = st.empty()
+agg = load_data(data_path, metrics_placeholder)
+
+if agg is not None:
+    total = agg['n_rows']
+    churn_pct = (eda.churn_count(agg, 'Yes') / total) * 100
+    non_churn_pct = (eda.churn_count(agg, 'No') / total) * 100
+    data_key = dataset.source_key(data_path)
+
+    # --- Informasi Dataset ---
+    with metrics_placeholder.container():
+        show_metrics(agg)
+
     st.markdown("---")
 
     # --- Pratinjau Data ---
     with st.expander("🔍 Pratinjau Data (5 Baris Teratas)", expanded=True):
-        st.dataframe(df.head(), use_container_width=True)
+        st.dataframe(pd.DataFrame(agg['preview'], columns=agg['columns']), use_container_width=True)
 
     # --- Deskripsi Fitur ---
     with st.expander("📝 Deskripsi Fitur"):
@@ -93,56 +139,58 @@ if df is not None:
 
     # 1. Distribusi Churn
     st.subheader("1. Distribusi Target Variable (Churn)")
-    fig_churn, ax_churn = plt.subplots(figsize=(8, 5))
-    sns.countplot(
-        x='Churn', data=df, ax=ax_churn,
-        palette=['#2E86AB', '#A23B72']
-    )
-    ax_churn.set_title('Distribusi Pelanggan Churn vs Non-Churn', fontsize=9, fontweight='bold')
-    ax_churn.set_ylabel('Jumlah Pelanggan')
-    ax_churn.set_xlabel('Status Churn')
-    total = len(df)
-    for p in ax_churn.patches:
-        height = p.get_height()
-        percentage = 100 * height / total
-        ax_churn.text(
-            p.get_x() + p.get_width()/2., height + 20,
-            f'{int(height)}\n({percentage:.1f}%)',
-            ha="center", va="bottom", fontweight='bold', fontsize=10
+    def draw_churn():
+        fig_churn, ax_churn = plt.subplots(figsize=(8, 5))
+        ax_churn.bar(
+            agg['churn_levels'], agg['churn_counts'], width=0.8,
+            color=['#2E86AB', '#A23B72']
         )
-    ax_churn.set_ylim(0, max([p.get_height() for p in ax_churn.patches]) * 1.15)
-    ax_churn.grid(axis='y', alpha=0.3)
-    sns.despine()
-    st.pyplot(fig_churn, use_container_width=True)
+        ax_churn.set_title('Distribusi Pelanggan Churn vs Non-Churn', fontsize=9, fontweight='bold')
+        ax_churn.set_ylabel('Jumlah Pelanggan')
+        ax_churn.set_xlabel('Status Churn')
+        for p in ax_churn.patches:
+            height = p.get_height()
+            percentage = 100 * height / total
+            ax_churn.text(
+                p.get_x() + p.get_width()/2., height + 20,
+                f'{int(height)}\n({percentage:.1f}%)',
+                ha="center", va="bottom", fontweight='bold', fontsize=10
+            )
+        ax_churn.set_ylim(0, max([p.get_height() for p in ax_churn.patches]) * 1.15)
+        ax_churn.grid(axis='y', alpha=0.3)
+        sns.despine(ax=ax_churn)
+        return fig_churn
+    show_chart(data_key, 'churn_distribution', draw_churn)
 
     st.warning(
-        "⚠️ **Dataset Tidak Seimbang**: 73.5% pelanggan tidak churn vs 26.5% churn. Akan ditangani dengan teknik SMOTE.",
+        f"⚠️ **Dataset Tidak Seimbang**: {non_churn_pct:.1f}% pelanggan tidak churn vs {churn_pct:.1f}% churn. "
+        "Akan ditangani dengan teknik SMOTE.",
         icon="⚠️"
     )
 
     # 2. Distribusi Fitur Numerik
     st.subheader("2. Distribusi Fitur Numerik Utama")
     col1, col2 = st.columns(2)
+    def draw_histogram(column, title, xlabel):
+        fig_hist, ax_hist = plt.subplots(figsize=(7, 4))
+        plot_histogram(ax_hist, agg, column)
+        ax_hist.set_title(title)
+        ax_hist.set_xlabel(xlabel)
+        return fig_hist
     with col1:
-        fig_tenure, ax_tenure = plt.subplots(figsize=(7, 4))
-        sns.histplot(
-            data=df, x='tenure', hue='Churn',
-            kde=True, bins=20, ax=ax_tenure,
-            palette=['#2E86AB', '#A23B72'], alpha=0.8
-        )
-        ax_tenure.set_title('Distribusi Tenure berdasarkan Status Churn')
-        ax_tenure.set_xlabel('Tenure (bulan)')
-        st.pyplot(fig_tenure, use_container_width=True)
+        show_chart(data_key, 'hist_tenure', lambda: draw_histogram(
+            'tenure', 'Distribusi Tenure berdasarkan Status Churn', 'Tenure (bulan)'))
     with col2:
-        fig_monthly, ax_monthly = plt.subplots(figsize=(7, 4))
-        sns.histplot(
-            data=df, x='MonthlyCharges', hue='Churn',
-            kde=True, bins=20, ax=ax_monthly,
-            palette=['#2E86AB', '#A23B72'], alpha=0.8
+        show_chart(data_key, 'hist_monthly_charges', lambda: draw_histogram(
+            'MonthlyCharges', 'Distribusi Monthly Charges berdasarkan Status Churn', 'Monthly Charges ($)'))
+
+    median_tenure = {level: eda.quantiles(agg, 'tenure', [0.5], level)[0] for level in ('Yes', 'No')}
+    median_monthly = {level: eda.quantiles(agg, 'MonthlyCharges', [0.5], level)[0] for level in ('Yes', 'No')}
+    if None not in median_tenure.values() and None not in median_monthly.values():
+        st.caption(
+            f"Median tenure: {median_tenure['Yes']:.0f} bulan (churn) vs {median_tenure['No']:.0f} bulan (tidak churn) · "
+            f"Median monthly charges: ${median_monthly['Yes']:.2f} (churn) vs ${median_monthly['No']:.2f} (tidak churn)"
         )
-        ax_monthly.set_title('Distribusi Monthly Charges berdasarkan Status Churn')
-        ax_monthly.set_xlabel('Monthly Charges ($)')
-        st.pyplot(fig_monthly, use_container_width=True)
 
     st.info("""
     **Key Insights:**
@@ -154,18 +202,35 @@ if df is not None:
     # 3. Analisis Fitur Kategorikal
     st.subheader("3. Analisis Fitur Kategorikal Kunci")
     categorical_features = ['Contract', 'InternetService', 'PaymentMethod']
-    fig, axes = plt.subplots(1, 3, figsize=(18, 5))
-    fig.suptitle('Churn Rate berdasarkan Fitur Kategorikal', fontsize=14, fontweight='bold')
-    for i, feature in enumerate(categorical_features):
-        ax = axes[i]
-        ct = pd.crosstab(df[feature], df['Churn'], normalize='index') * 100
-        ct.plot(kind='bar', ax=ax, color=['#2E86AB', '#A23B72'])
-        ax.set_title(f'Churn Rate by {feature}')
-        ax.set_ylabel('Persentase (%)')
-        ax.legend(['No Churn', 'Churn'])
-        ax.tick_params(axis='x', rotation=45)
-    plt.tight_layout()
-    st.pyplot(fig, use_container_width=True)
+    def draw_categorical():
+        fig, axes = plt.subplots(1, 3, figsize=(18, 5))
+        fig.suptitle('Churn Rate berdasarkan Fitur Kategorikal', fontsize=14, fontweight='bold')
+        for i, feature in enumerate(categorical_features):
+            ax = axes[i]
+            ct = eda.churn_rate(agg, feature)
+            ct.plot(kind='bar', ax=ax, color=['#2E86AB', '#A23B72'])
+            ax.set_title(f'Churn Rate by {feature}')
+            ax.set_ylabel('Persentase (%)')
+            ax.legend(['No Churn', 'Churn'])
+            ax.tick_params(axis='x', rotation=45)
+        fig.tight_layout()
+        return fig
+    show_chart(data_key, 'categorical_churn_rate', draw_categorical)
+
+    with st.expander("🔗 Churn Rate Kombinasi Fitur Kunci"):
+        pasangan = st.selectbox(
+            "Pasangan fitur",
+            [key.split('|') for key in agg['pairs']],
+            format_func=lambda pair: f"{pair[0]} × {pair[1]}"
+        )
+        def draw_pair():
+            rate = eda.pair_churn_rate(agg, *pasangan)
+            fig_pair, ax_pair = plt.subplots(figsize=(8, 4))
+            sns.heatmap(rate, annot=True, fmt='.1f', cmap='RdPu', cbar_kws={'label': 'Churn Rate (%)'}, ax=ax_pair)
+            ax_pair.set_title(f'Churn Rate (%) berdasarkan {pasangan[0]} dan {pasangan[1]}')
+            fig_pair.tight_layout()
+            return fig_pair
+        show_chart(data_key, f"pair_{'_'.join(pasangan)}", draw_pair)
 
     st.success(
         """
@@ -182,10 +247,10 @@ if df is not None:
     # Kesimpulan EDA
     st.header("🎯 Kesimpulan EDA")
     st.markdown(
-        """
+        f"""
         **📊 Karakteristik Dataset:**
-        - 7,043 pelanggan dengan 21 fitur
-        - Dataset tidak seimbang (73.5% vs 26.5%)
+        - {total:,} pelanggan dengan {len(agg['columns'])} fitur
+        - Dataset tidak seimbang ({non_churn_pct:.1f}% vs {churn_pct:.1f}%)
 
         **🔍 Faktor Utama Churn:**
         1. **Tenure rendah** - Pelanggan baru berisiko tinggi
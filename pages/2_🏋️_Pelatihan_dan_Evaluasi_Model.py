@@ -3,6 +3,9 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
+import os
+
+from churn import evaluate, figures, pipeline
 
 # --- Konfigurasi Halaman ---
 st.set_page_config(
@@ -46,123 +49,171 @@ with st.container():
 
 st.markdown("---")
 
-# --- Overview Card (Diselaraskan) ---
-st.markdown("### 📋 Ringkasan Training")
-col1, col2, col3, col4 = st.columns(4)
-with col1:
-    st.metric(label="Dataset", value="Telco Churn", delta="7043 sampel", help="Jumlah data setelah preprocessing")
-with col2:
-    st.metric(label="Balancing", value="SMOTE", delta="Synthetic Oversampling")
-with col3:
-    st.metric(label="Model", value="4 Algoritma", delta="ML Classification")
-with col4:
-    st.metric(label="🏆 Best Model", value="XGBoost", delta="Best F1-Score")
-
-st.warning(
-    "⚠️ **Dataset Tidak Seimbang**: Ditangani dengan teknik SMOTE sebelum training.",
-    icon="⚠️"
-)
-
-st.markdown("---")
-
-# --- Tabel Performa Model ---
-st.markdown("### 📈 Perbandingan Performa Model")
-data_performa = {
-    'Model': ['XGBoost', 'Logistic Regression', 'Random Forest', 'Support Vector Machine'],
-    'Akurasi': [0.8009, 0.7495, 0.7802, 0.7545],
-    'Precision (Churn)': [0.61, 0.52, 0.58, 0.53],
-    'Recall (Churn)': [0.68, 0.80, 0.59, 0.72],
-    'F1-Score (Churn)': [0.64, 0.63, 0.59, 0.61]
+# --- Muat Hasil Evaluasi (saved_models/evaluation.json) ---
+MODEL_LABELS = {
+    'xgboost': 'XGBoost',
+    'logistic_regression': 'Logistic Regression',
+    'random_forest': 'Random Forest',
+    'support_vector_machine': 'Support Vector Machine',
+    'support_vector_machine_approx': 'SVM Aproksimasi',
 }
-df_performa = pd.DataFrame(data_performa).sort_values('F1-Score (Churn)', ascending=False).reset_index(drop=True)
-df_performa['Ranking'] = ['🥇', '🥈', '🥉', '4️⃣']
-df_performa = df_performa[['Ranking','Model','Akurasi','Precision (Churn)','Recall (Churn)','F1-Score (Churn)']]
-
-def highlight_max(s):
-    if s.name in ['Ranking', 'Model']: return ['']*len(s)
-    is_max = s == s.max()
-    return ['background-color: #2E86AB; color: white; font-weight: bold' if v else '' for v in is_max]
-
-st.dataframe(
-    df_performa.style.apply(highlight_max, axis=0).format({
-        'Akurasi': '{:.3f}',
-        'Precision (Churn)': '{:.2f}',
-        'Recall (Churn)': '{:.2f}',
-        'F1-Score (Churn)': '{:.2f}'
-    }),
-    use_container_width=True, hide_index=True
-)
-
-# --- Visualisasi Performa Model ---
-st.markdown("### 📊 Visualisasi Performa Model")
-col1, col2 = st.columns(2)
-with col1:
-    fig, ax = plt.subplots()
-    sns.barplot(x='Model', y='Akurasi', data=df_performa, palette=['#2E86AB', '#A23B72', '#F9A602', '#6C3483'], ax=ax)
-    ax.set_title('Akurasi Tiap Model')
-    ax.set_ylim(0,1)
-    st.pyplot(fig, use_container_width=True)
-with col2:
-    fig, ax = plt.subplots()
-    sns.barplot(x='Model', y='F1-Score (Churn)', data=df_performa, palette=['#2E86AB', '#A23B72', '#F9A602', '#6C3483'], ax=ax)
-    ax.set_title('F1-Score (Churn) Tiap Model')
-    ax.set_ylim(0,1)
-    st.pyplot(fig, use_container_width=True)
-
-# --- Interpretasi & Rekomendasi ---
-with st.expander("📖 Interpretasi Hasil & Rekomendasi", expanded=True):
-    st.success("""
-    - **XGBoost**: F1-score tertinggi (0.64), akurasi terbaik (0.80) → **Recommended**.
-    - **Logistic Regression**: Recall tertinggi (0.80), baik untuk mendeteksi churn.
-    - **Random Forest**: Akurasi tinggi, recall rendah.
-    - **SVM**: Recall tinggi (0.72), akurasi lebih rendah.
-    """)
-
-st.markdown("---")
-
-# --- Laporan Klasifikasi Detail ---
-st.markdown("### 📄 Laporan Klasifikasi Detail")
-tab1, tab2, tab3, tab4 = st.tabs(["XGBoost", "Logistic Regression", "Random Forest", "SVM"])
-with tab1:
-    st.subheader("XGBoost")
-    st.code("""
-              precision    recall  f1-score   support
-
-          No       0.88      0.84      0.86      1031
-         Yes       0.61      0.68      0.64       370
-
-    accuracy                           0.80      1401
-    """, language='text')
-with tab2:
-    st.subheader("Logistic Regression")
-    st.code("""
-              precision    recall  f1-score   support
-
-          No       0.91      0.73      0.81      1031
-         Yes       0.52      0.80      0.63       370
-
-    accuracy                           0.75      1401
-    """, language='text')
-with tab3:
-    st.subheader("Random Forest")
-    st.code("""
-              precision    recall  f1-score   support
-
-          No       0.85      0.85      0.85      1031
-         Yes       0.58      0.59      0.59       370
-
-    accuracy                           0.78      1401
-    """, language='text')
-with tab4:
-    st.subheader("Support Vector Machine")
-    st.code("""
-              precision    recall  f1-score   support
-
-          No       0.88      0.77      0.82      1031
-         Yes       0.53      0.72      0.61       370
-
-    accuracy                           0.75      1401
-    """, language='text')
+PALETTE = ['#2E86AB', '#A23B72', '#F9A602', '#6C3483', '#27AE60']
+
+
+@st.cache_data
+def load_evaluation(mtime):
+    # mtime ikut menjadi kunci cache sehingga file yang diperbarui langsung terbaca
+    return evaluate.load_evaluation()
+
+
+def show_chart(data_key, chart_id, draw):
+    # Grafik dirender sekali per (hash hasil evaluasi, id grafik, tema) lalu disajikan dari cache bytes PNG
+    theme = st.context.theme.type or 'light'
+    st.image(figures.cached_figure((data_key, chart_id, theme), draw), use_container_width=True)
+
+
+def evaluation_mtime():
+    path = os.path.join(pipeline.BASE_PATH, evaluate.EVALUATION_FILE)
+    return os.path.getmtime(path) if os.path.exists(path) else None
+
+
+@st.cache_data
+def stale_models(mtime, files_state):
+    # Meng-hash file model cukup sekali per kombinasi (mtime evaluasi, mtime + ukuran setiap file model)
+    return evaluate.stale_models(load_evaluation(mtime))
+
+
+hasil_evaluasi = load_evaluation(evaluation_mtime())
+
+if hasil_evaluasi is None or not hasil_evaluasi['models']:
+    st.warning(
+        "Belum ada hasil evaluasi. Jalankan `python -m churn.evaluate` atau tekan tombol di bawah.",
+        icon="⚠️"
+    )
+else:
+    model_basi = stale_models(evaluation_mtime(), evaluate.model_files_state())
+    if model_basi:
+        st.warning(
+            f"⚠️ Hasil evaluasi tidak sesuai dengan model yang ter-deploy: {', '.join(model_basi)}. "
+            "Jalankan evaluasi ulang agar angka di halaman ini akurat.",
+            icon="⚠️"
+        )
+
+if st.button("🔁 Evaluasi Ulang Model", type="secondary"):
+    with st.spinner("🔄 Mengevaluasi model pada data uji..."):
+        evaluate.run_evaluation()
+    st.cache_data.clear()
+    st.rerun()
+
+if hasil_evaluasi and hasil_evaluasi['models']:
+    hasil_model = hasil_evaluasi['models']
+    data_key = figures.content_key(hasil_evaluasi)
+    df_performa = pd.DataFrame([
+        {
+            'Model': MODEL_LABELS.get(name, name),
+            'Akurasi': m['accuracy'],
+            'Precision (Churn)': m['precision_churn'],
+            'Recall (Churn)': m['recall_churn'],
+            'F1-Score (Churn)': m['f1_churn'],
+            'p50 (ms/baris)': m['latency']['p50_ms'],
+            'p99 (ms/baris)': m['latency']['p99_ms'],
+            'Throughput (baris/s)': m['latency']['rows_per_s'],
+        }
+        for name, m in hasil_model.items()
+    ]).sort_values('F1-Score (Churn)', ascending=False).reset_index(drop=True)
+    df_performa.insert(0, 'Ranking', ['🥇', '🥈', '🥉', '4️⃣', '5️⃣'][:len(df_performa)])
+    terbaik = df_performa.iloc[0]
+
+    # --- Overview Card (Diselaraskan) ---
+    st.markdown("### 📋 Ringkasan Training")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric(label="Dataset", value="Telco Churn", delta=f"{hasil_evaluasi['n_test']} sampel uji", help="Jumlah data uji (20% split stratified)")
+    with col2:
+        st.metric(label="Balancing", value="SMOTE", delta="Synthetic Oversampling")
+    with col3:
+        st.metric(label="Model", value=f"{len(df_performa)} Algoritma", delta="ML Classification")
+    with col4:
+        st.metric(label="🏆 Best Model", value=terbaik['Model'], delta="Best F1-Score")
+
+    st.warning(
+        "⚠️ **Dataset Tidak Seimbang**: Ditangani dengan teknik SMOTE sebelum training.",
+        icon="⚠️"
+    )
+    st.caption(f"Hasil evaluasi: {hasil_evaluasi['generated_at']} • data: `{hasil_evaluasi['data']}`")
+
+    st.markdown("---")
+
+    # --- Tabel Performa Model ---
+    st.markdown("### 📈 Perbandingan Performa Model")
+
+    def highlight_best(s):
+        if s.name in ['Ranking', 'Model']: return ['']*len(s)
+        # Untuk latensi, nilai terkecil yang terbaik
+        is_best = s == (s.min() if s.name.startswith('p') and 'ms' in s.name else s.max())
+        return ['background-color: #2E86AB; color: white; font-weight: bold' if v else '' for v in is_best]
+
+    st.dataframe(
+        df_performa.style.apply(highlight_best, axis=0).format({
+            'Akurasi': '{:.3f}',
+            'Precision (Churn)': '{:.2f}',
+            'Recall (Churn)': '{:.2f}',
+            'F1-Score (Churn)': '{:.2f}',
+            'p50 (ms/baris)': '{:.3f}',
+            'p99 (ms/baris)': '{:.3f}',
+            'Throughput (baris/s)': '{:,.0f}'
+        }),
+        use_container_width=True, hide_index=True
+    )
+
+    # --- Visualisasi Performa Model ---
+    st.markdown("### 📊 Visualisasi Performa Model")
+    palette = PALETTE[:len(df_performa)]
+    col1, col2 = st.columns(2)
+    def draw_bar(kolom, judul):
+        fig, ax = plt.subplots()
+        sns.barplot(x='Model', y=kolom, data=df_performa, palette=palette, ax=ax)
+        ax.set_title(judul)
+        ax.set_ylim(0,1)
+        return fig
+    with col1:
+        show_chart(data_key, 'bar_accuracy', lambda: draw_bar('Akurasi', 'Akurasi Tiap Model'))
+    with col2:
+        show_chart(data_key, 'bar_f1', lambda: draw_bar('F1-Score (Churn)', 'F1-Score (Churn) Tiap Model'))
+
+    # --- Interpretasi & Rekomendasi ---
+    recall_terbaik = df_performa.loc[df_performa['Recall (Churn)'].idxmax()]
+    tercepat = df_performa.loc[df_performa['p50 (ms/baris)'].idxmin()]
+    with st.expander("📖 Interpretasi Hasil & Rekomendasi", expanded=True):
+        st.success(f"""
+        - **{terbaik['Model']}**: F1-score tertinggi ({terbaik['F1-Score (Churn)']:.2f}), akurasi {terbaik['Akurasi']:.2f} → **Recommended**.
+        - **{recall_terbaik['Model']}**: Recall tertinggi ({recall_terbaik['Recall (Churn)']:.2f}), baik untuk mendeteksi churn.
+        - **{tercepat['Model']}**: Latensi terendah ({tercepat['p50 (ms/baris)']:.3f} ms/baris, {tercepat['Throughput (baris/s)']:,.0f} baris/s) → cocok untuk skoring volume besar.
+        """)
+
+    st.markdown("---")
+
+    # --- Laporan Klasifikasi Detail ---
+    st.markdown("### 📄 Laporan Klasifikasi Detail")
+    tabs = st.tabs([MODEL_LABELS.get(name, name) for name in hasil_model])
+    for tab, (name, m) in zip(tabs, hasil_model.items()):
+        with tab:
+            st.subheader(MODEL_LABELS.get(name, name))
+            col1, col2 = st.columns([3, 2])
+            with col1:
+                st.code(m['classification_report'], language='text')
+            with col2:
+                def draw_confusion(matrix=m['confusion_matrix']):
+                    fig, ax = plt.subplots(figsize=(4, 3))
+                    sns.heatmap(
+                        np.array(matrix), annot=True, fmt='d', cmap='Blues',
+                        xticklabels=['No', 'Yes'], yticklabels=['No', 'Yes'], ax=ax
+                    )
+                    ax.set_xlabel('Prediksi')
+                    ax.set_ylabel('Aktual')
+                    ax.set_title('Confusion Matrix')
+                    return fig
+                show_chart(data_key, f'confusion_{name}', draw_confusion)
 
 # --- Footer / Divider ---
 st.markdown("---")
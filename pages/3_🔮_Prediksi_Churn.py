@@ -1,7 +1,11 @@
 import streamlit as st
 import pandas as pd
-import joblib
 import os
+import tempfile
+import time
+import matplotlib.pyplot as plt
+
+from churn import compare, encoder, figures, pipeline, prediction_cache, scenario, timing
 
 # --- HEADER & LOGO (Selaraskan dengan Page 1 & 2) ---
 st.set_page_config(
@@ -44,24 +48,43 @@ st.markdown("---")
 
 
 # --- Muat Aset ---
-@st.cache_resource
-def load_assets():
-    base_path = 'saved_models'
-    try:
-        models = {
-            "XGBoost (Seimbang)": joblib.load(os.path.join(base_path, 'xgboost_churn_model.pkl')),
-            "Logistic Regression (Deteksi Maksimal)": joblib.load(os.path.join(base_path, 'logistic_regression_churn_model.pkl')),
-            "Random Forest": joblib.load(os.path.join(base_path, 'random_forest_churn_model.pkl')),
-            "Support Vector Machine": joblib.load(os.path.join(base_path, 'support_vector_machine_churn_model.pkl'))
-        }
-        scaler = joblib.load(os.path.join(base_path, 'scaler.pkl'))
-        model_columns = joblib.load(os.path.join(base_path, 'model_columns.pkl'))
-    except FileNotFoundError as e:
-        st.error(f"Error memuat file model: {e}. Pastikan semua file .pkl ada di folder 'saved_models'.")
-        return None, None, None
-    return models, scaler, model_columns
+# Label tombol di halaman -> nama model di churn/pipeline.py
+MODEL_PILIHAN = {
+    "XGBoost (Seimbang)": 'xgboost',
+    "Logistic Regression (Deteksi Maksimal)": 'logistic_regression',
+    "Random Forest": 'random_forest',
+    "Support Vector Machine": 'support_vector_machine'
+}
+
+
+@st.cache_resource(show_spinner="⏳ Memuat model...")
+def load_model(name):
+    # Dimuat saat model pertama kali dipilih, lalu dipakai bersama oleh semua sesi; input yang
+    # sama persis (mis. preset isi cepat) diambil dari cache prediksi bersama
+    return prediction_cache.cached(pipeline.load_fused(name))
 
-models, scaler, model_columns = load_assets()
+
+def available_models():
+    tersedia = pipeline.available_models()
+    return [label for label, name in MODEL_PILIHAN.items() if name in tersedia]
+
+
+# --- Debug Latensi (opsional) ---
+# Hanya mengaktifkan trace untuk sesi (thread) ini; flag global tetap dari CHURN_TIMING
+debug_timing = st.sidebar.toggle(
+    "🩺 Debug Latensi per Tahap",
+    key='debug_timing',
+    help="Ukur waktu muat aset, encoding, alignment, scaling, prediksi, dan rendering"
+)
+if debug_timing:
+    spans = timing.default_metrics.start_trace()
+else:
+    timing.default_metrics.stop_trace()
+
+
+models = available_models()
+if not models:
+    st.error("Tidak ada file model yang ditemukan. Pastikan file .pkl ada di folder 'saved_models'.")
 
 if models:
     # --- BUTTON 1: Info Model Toggle ---
@@ -105,38 +128,67 @@ if models:
     col_model3, col_model4 = st.columns(2)
     
     # Initialize session state for model selection
-    if 'selected_model' not in st.session_state:
-        st.session_state.selected_model = "XGBoost (Seimbang)"
+    if st.session_state.get('selected_model') not in models:
+        st.session_state.selected_model = models[0]
     
     with col_model1:
         if st.button("🥇 XGBoost (Seimbang)", 
                     type="primary" if st.session_state.selected_model == "XGBoost (Seimbang)" else "secondary",
+                    disabled="XGBoost (Seimbang)" not in models,
+                    help=None if "XGBoost (Seimbang)" in models else "Model tidak tersedia di folder 'saved_models'",
                     use_container_width=True):
             st.session_state.selected_model = "XGBoost (Seimbang)"
     
     with col_model2:
         if st.button("🥈 Logistic Regression", 
                     type="primary" if st.session_state.selected_model == "Logistic Regression (Deteksi Maksimal)" else "secondary",
+                    disabled="Logistic Regression (Deteksi Maksimal)" not in models,
+                    help=None if "Logistic Regression (Deteksi Maksimal)" in models else "Model tidak tersedia di folder 'saved_models'",
                     use_container_width=True):
             st.session_state.selected_model = "Logistic Regression (Deteksi Maksimal)"
     
     with col_model3:
         if st.button("🥉 Random Forest", 
                     type="primary" if st.session_state.selected_model == "Random Forest" else "secondary",
+                    disabled="Random Forest" not in models,
+                    help=None if "Random Forest" in models else "Model tidak tersedia di folder 'saved_models'",
                     use_container_width=True):
             st.session_state.selected_model = "Random Forest"
     
     with col_model4:
         if st.button("4️⃣ Support Vector Machine", 
                     type="primary" if st.session_state.selected_model == "Support Vector Machine" else "secondary",
+                    disabled="Support Vector Machine" not in models,
+                    help=None if "Support Vector Machine" in models else "Model tidak tersedia di folder 'saved_models'",
                     use_container_width=True):
             st.session_state.selected_model = "Support Vector Machine"
     
     # Display selected model
     st.info(f"🎯 **Model Terpilih:** {st.session_state.selected_model}")
     
-    # Dapatkan objek model yang dipilih
-    chosen_model = models[st.session_state.selected_model]
+    # Dapatkan objek model yang dipilih (dimuat saat pertama kali dipakai)
+    chosen_model = load_model(MODEL_PILIHAN[st.session_state.selected_model])
+
+    # Mode perbandingan: input yang sama dinilai semua model secara paralel (lihat churn/compare.py)
+    compare_all = st.toggle(
+        "⚖️ Bandingkan Semua Model",
+        key='compare_all',
+        help="Nilai input (atau file batch) yang sama dengan semua model yang tersedia sekaligus"
+    )
+    use_ensemble = compare_all and st.checkbox(
+        "Tambahkan ensemble (rata-rata probabilitas semua model)", value=True, key='compare_ensemble'
+    )
+    all_models = {MODEL_PILIHAN[label]: load_model(MODEL_PILIHAN[label]) for label in models} if compare_all else {}
+
+    threshold = st.slider(
+        'Ambang Keputusan Churn',
+        min_value=0.05,
+        max_value=0.95,
+        value=0.5,
+        step=0.05,
+        key='threshold',
+        help="Pelanggan diprediksi CHURN jika probabilitas churn ≥ ambang ini"
+    )
     
     st.markdown("---")
 
@@ -409,7 +461,7 @@ if models:
     # --- Logika Prediksi ---
     # --- (Salin dan GANTI seluruh blok if submitted di kode Anda dengan ini) ---
 
-if submitted:
+if models and submitted:
     with st.spinner('🔄 Sedang memproses prediksi...'):
         # Sesuai dengan pipeline di Colab Anda:
         input_dict = {
@@ -420,28 +472,25 @@ if submitted:
             'PaperlessBilling': PaperlessBilling, 'PaymentMethod': PaymentMethod, 'MonthlyCharges': MonthlyCharges,
             'TotalCharges': TotalCharges
         }
-        input_df = pd.DataFrame([input_dict])
 
-        # Menangani kasus khusus: jika tenure=0, maka TotalCharges harus 0
-        if input_df['tenure'].iloc[0] == 0:
-            input_df['TotalCharges'] = 0.0
-
-        # Pra-pemrosesan persis seperti di Colab
-        kolom_diubah = ["OnlineSecurity", "OnlineBackup", "DeviceProtection", "TechSupport", "StreamingTV", "StreamingMovies"]
-        for kolom in kolom_diubah:
-            input_df[kolom] = input_df[kolom].replace("No internet service", "No")
-        input_df["MultipleLines"] = input_df["MultipleLines"].replace("No phone service", "No")
-
-        input_encoded = pd.get_dummies(input_df, drop_first=True)
-        input_aligned = input_encoded.reindex(columns=model_columns, fill_value=0)
-        input_scaled = scaler.transform(input_aligned)
+        # Pra-pemrosesan persis seperti di Colab (lihat churn/pipeline.py)
+        input_encoded = pipeline.preprocess_record(input_dict, chosen_model.model_columns)
         
         # Prediksi menggunakan model yang dipilih
-        prediction = chosen_model.predict(input_scaled)
-        prediction_proba = chosen_model.predict_proba(input_scaled)
+        prediction, prediction_proba = chosen_model.predict_label_proba(input_encoded, threshold)
+
+        # Disimpan agar eksplorasi skenario tetap tersedia pada rerun berikutnya
+        st.session_state.scenario_input = input_dict
+
+        comparison = None
+        if compare_all:
+            comparison = compare.score_all(
+                lambda columns: pipeline.preprocess_record(input_dict, columns), all_models, use_ensemble
+            )
     
     # --- Tampilkan Hasil dengan Styling ---
     # Pastikan prediksi berhasil sebelum menampilkan hasil
+    render_start = time.perf_counter()
     if prediction_proba is not None and len(prediction_proba) > 0:
         st.markdown("---")
         st.markdown(f"### 📊 Hasil Prediksi: **{st.session_state.selected_model}**")
@@ -497,6 +546,37 @@ if submitted:
                 delta=f"{no_churn_prob - 50:.1f}%" if no_churn_prob > 50 else None
             )
 
+        if comparison is not None:
+            st.markdown("#### ⚖️ Perbandingan Semua Model")
+            probas, timings, wall = comparison
+            label_model = {name: label for label, name in MODEL_PILIHAN.items()}
+            label_model[compare.ENSEMBLE_NAME] = "Ensemble (rata-rata probabilitas)"
+            df_banding = pd.DataFrame([
+                {
+                    'Model': label_model.get(name, name),
+                    'Prediksi': 'CHURN' if proba[0] >= threshold else 'TIDAK CHURN',
+                    'Probabilitas Churn (%)': proba[0] * 100,
+                    'Waktu (ms)': timings[name] * 1e3 if name in timings else None,
+                }
+                for name, proba in probas.items()
+            ])
+            st.dataframe(
+                df_banding.style.format({'Probabilitas Churn (%)': '{:.2f}', 'Waktu (ms)': '{:.2f}'}, na_rep='-'),
+                use_container_width=True, hide_index=True
+            )
+            st.caption(
+                f"⏱️ Total {wall * 1e3:.1f} ms untuk {len(timings)} model secara paralel "
+                f"(jumlah waktu per model {sum(timings.values()) * 1e3:.1f} ms, model terlambat "
+                f"{max(timings.values()) * 1e3:.1f} ms)"
+            )
+
+        cache_stats = prediction_cache.default_cache.stats()
+        if cache_stats['hit_rate'] is not None:
+            st.caption(
+                f"♻️ Cache prediksi (semua sesi): {cache_stats['hits']:,} hit, {cache_stats['misses']:,} miss "
+                f"({cache_stats['hit_rate']:.0%} hit rate)"
+            )
+
         # BAGIAN VISUALISASI PROBABILITAS TELAH DIHAPUS
         
         # Rekomendasi berdasarkan hasil
@@ -564,11 +644,232 @@ if submitted:
                     if key in st.session_state:
                         del st.session_state[key]
                 st.rerun()
+
+        if timing.is_recording():
+            timing.default_metrics.observe('render', time.perf_counter() - render_start)
     else:
         # Menampilkan pesan jika prediksi gagal
         st.error("Gagal melakukan prediksi. Model tidak memberikan output yang valid.")
         st.info("Hal ini bisa terjadi jika kombinasi input sangat tidak biasa. Coba ubah input Anda dan lakukan prediksi lagi.")
 
+# --- Eksplorasi Skenario (What-if) ---
+def draw_scenario(proba, record, threshold):
+    fig, axes = plt.subplots(1, len(scenario.KONTRAK), figsize=(18, 4.5), sharey=True)
+    for ax, (j, kontrak) in zip(axes, enumerate(scenario.KONTRAK)):
+        gambar = ax.imshow(
+            proba[:, j, :].T, aspect='auto', origin='lower', cmap='RdYlGn_r', vmin=0, vmax=1,
+            extent=(scenario.TENURE_VALUES[0] - 0.5, scenario.TENURE_VALUES[-1] + 0.5,
+                    -0.5, len(scenario.METODE_PEMBAYARAN) - 0.5)
+        )
+        # Garis ambang keputusan: di sisi merah pelanggan diprediksi CHURN
+        if proba[:, j, :].min() < threshold < proba[:, j, :].max():
+            ax.contour(scenario.TENURE_VALUES, range(len(scenario.METODE_PEMBAYARAN)), proba[:, j, :].T,
+                       levels=[threshold], colors='black', linewidths=1.5, linestyles='--')
+        if record['Contract'] == kontrak:
+            ax.plot(record['tenure'], scenario.METODE_PEMBAYARAN.index(record['PaymentMethod']),
+                    marker='*', markersize=16, color='white', markeredgecolor='black')
+        ax.set_title(f'Contract: {kontrak}')
+        ax.set_xlabel('Tenure (bulan)')
+        ax.set_yticks(range(len(scenario.METODE_PEMBAYARAN)))
+        ax.set_yticklabels(scenario.METODE_PEMBAYARAN)
+    fig.colorbar(gambar, ax=axes, label='Probabilitas Churn', shrink=0.9)
+    return fig
+
+
+if models and 'scenario_input' in st.session_state:
+    st.markdown("---")
+    st.markdown("### 🧪 Eksplorasi Skenario (What-if)")
+    scenario_input = st.session_state.scenario_input
+    st.caption(
+        f"Probabilitas churn pelanggan terakhir yang diprediksi untuk tenure 0–72 bulan × setiap jenis kontrak × "
+        f"setiap metode pembayaran ({len(scenario.TENURE_VALUES) * len(scenario.KONTRAK) * len(scenario.METODE_PEMBAYARAN):,} "
+        f"varian dalam satu pemanggilan model **{st.session_state.selected_model}**). Total biaya disesuaikan menjadi "
+        "tenure × biaya bulanan; ★ menandai kondisi saat ini, garis putus-putus adalah ambang keputusan."
+    )
+    scenario_proba = scenario.sweep(scenario_input, chosen_model)
+    chart_key = (figures.content_key(scenario_input, st.session_state.selected_model, threshold),
+                 'scenario_surface', st.context.theme.type or 'light')
+    with timing.span('render'):
+        st.image(figures.cached_figure(chart_key, lambda: draw_scenario(scenario_proba, scenario_input, threshold)),
+                 use_container_width=True)
+
+    # Kombinasi kontrak & pembayaran dengan risiko terendah pada tenure saat ini
+    posisi_tenure = min(int(scenario_input['tenure']), len(scenario.TENURE_VALUES) - 1)
+    j, k = divmod(int(scenario_proba[posisi_tenure].argmin()), len(scenario.METODE_PEMBAYARAN))
+    st.info(
+        f"💡 Pada tenure {posisi_tenure} bulan, risiko terendah dicapai dengan kontrak **{scenario.KONTRAK[j]}** dan "
+        f"pembayaran **{scenario.METODE_PEMBAYARAN[k]}** (probabilitas churn {scenario_proba[posisi_tenure, j, k]:.1%})."
+    )
+    st.download_button(
+        label="📥 Unduh Grid Skenario",
+        data=scenario.to_frame(scenario_proba).to_csv(index=False).encode('utf-8'),
+        file_name="skenario_churn.csv",
+        mime="text/csv",
+        type="secondary"
+    )
+
+# --- Prediksi Batch dari File CSV ---
+# Hasil batch ditulis ke file sementara (bukan memori sesi) dan dibaca hanya saat diunduh
+BATCH_DIR = os.path.join(tempfile.gettempdir(), 'churn_batch')
+BATCH_MAX_AGE = 24 * 3600
+
+
+def remove_batch_result():
+    hasil = st.session_state.pop('batch_result', None)
+    if hasil is not None and os.path.exists(hasil['path']):
+        os.remove(hasil['path'])
+
+
+def remove_old_batch_files():
+    # File dari sesi yang sudah ditutup tanpa menjalankan batch baru
+    batas = time.time() - BATCH_MAX_AGE
+    for entry in os.scandir(BATCH_DIR):
+        if entry.is_file() and entry.stat().st_mtime < batas:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+def batch_error_message(e, chunk, offset):
+    """Pesan yang menunjuk kolom atau baris (nomor baris data, mulai 1) penyebab kegagalan."""
+    if chunk is None or isinstance(e, pd.errors.ParserError):
+        return f"File CSV tidak bisa dibaca: {e}"
+    if isinstance(e, KeyError):
+        hilang = [kolom for kolom in encoder.KOLOM_FITUR if kolom not in chunk.columns]
+        return f"Kolom {', '.join(hilang) or e.args[0]} tidak ada di file. Format harus sama dengan `data/Churn.csv`."
+    for kolom in ('SeniorCitizen', 'tenure', 'MonthlyCharges'):
+        if kolom in chunk.columns:
+            gagal = pd.to_numeric(chunk[kolom], errors='coerce').isna() & chunk[kolom].notna()
+            if gagal.any():
+                i = int(gagal.to_numpy().argmax())
+                return f"Baris {offset + i + 1}: kolom {kolom} berisi {chunk[kolom].iloc[i]!r}, bukan angka."
+    return f"Baris {offset + 1}–{offset + len(chunk)}: {e}"
+
+
+def read_file(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+if models:
+    st.markdown("---")
+    st.markdown("### 📂 Prediksi Batch (Upload CSV)")
+    st.caption(
+        "Unggah file dengan format yang sama seperti `data/Churn.csv`. Data diproses per chunk "
+        + ("menggunakan **semua model** secara paralel." if compare_all
+           else f"menggunakan model **{st.session_state.selected_model}**.")
+    )
+
+    col_up1, col_up2 = st.columns([3, 1])
+    with col_up1:
+        uploaded_file = st.file_uploader("File CSV pelanggan", type=["csv"])
+    with col_up2:
+        chunk_size = st.number_input("Ukuran Chunk (baris)", min_value=1_000, max_value=500_000, value=50_000, step=10_000)
+
+    # SVC penuh mahal untuk jutaan baris; pakai versi aproksimasi jika sudah dilatih (churn/approx_svm.py)
+    batch_model = chosen_model
+    batch_models = dict(all_models)
+    if ((compare_all and 'support_vector_machine' in batch_models)
+            or st.session_state.selected_model == "Support Vector Machine") \
+            and 'support_vector_machine_approx' in pipeline.available_models():
+        if st.checkbox("⚡ Gunakan SVM aproksimasi (Nyström/RFF) untuk batch", value=True,
+                       help="Kernel RBF yang sama diaproksimasi dengan model linear; jauh lebih cepat untuk file besar"):
+            if compare_all:
+                batch_models['support_vector_machine'] = load_model('support_vector_machine_approx')
+            else:
+                batch_model = load_model('support_vector_machine_approx')
+
+    if uploaded_file is not None and st.button("🚀 Jalankan Prediksi Batch", type="primary", use_container_width=True):
+        remove_batch_result()
+        os.makedirs(BATCH_DIR, exist_ok=True)
+        remove_old_batch_files()
+        fd, path = tempfile.mkstemp(suffix='.csv', dir=BATCH_DIR)
+        total_rows = 0
+        chunk = None
+        status = st.empty()
+        start = time.perf_counter()
+
+        try:
+            with open(fd, 'w', newline='', encoding='utf-8') as output:
+                for i, chunk in enumerate(pd.read_csv(uploaded_file, chunksize=int(chunk_size))):
+                    if compare_all:
+                        hasil = compare.score_frame_all(chunk, batch_models, threshold, use_ensemble)
+                    else:
+                        hasil = pipeline.score_frame(chunk, batch_model, threshold)
+                    with timing.span('render'):
+                        hasil.to_csv(output, header=(i == 0), index=False)
+
+                    total_rows += len(chunk)
+                    elapsed = time.perf_counter() - start
+                    status.info(f"⏳ {total_rows:,} baris diproses ({total_rows / elapsed:,.0f} baris/detik)")
+        except Exception as e:
+            status.empty()
+            os.remove(path)
+            st.error(f"❌ Prediksi batch gagal. {batch_error_message(e, chunk, total_rows)}")
+        else:
+            status.empty()
+            st.session_state.batch_result = {
+                'model': "Semua Model" if compare_all else st.session_state.selected_model,
+                'path': path,
+                'rows': total_rows,
+                'seconds': time.perf_counter() - start
+            }
+
+    if 'batch_result' in st.session_state and not os.path.exists(st.session_state.batch_result['path']):
+        # Dihapus oleh pembersihan file lama dari sesi lain
+        del st.session_state.batch_result
+
+    if 'batch_result' in st.session_state:
+        batch_result = st.session_state.batch_result
+        col_b1, col_b2, col_b3 = st.columns(3)
+        with col_b1:
+            st.metric("Baris Diproses", f"{batch_result['rows']:,}")
+        with col_b2:
+            st.metric("Waktu Proses", f"{batch_result['seconds']:.2f} s")
+        with col_b3:
+            st.metric("Throughput", f"{batch_result['rows'] / max(batch_result['seconds'], 1e-9):,.0f} baris/s")
+
+        st.download_button(
+            label="📥 Unduh Hasil Prediksi Batch",
+            data=lambda: read_file(batch_result['path']),
+            file_name=f"prediksi_batch_{batch_result['model'].replace(' ', '_')}.csv",
+            mime="text/csv",
+            type="secondary",
+            use_container_width=True
+        )
+
+# --- Panel Debug Latensi ---
+if debug_timing:
+    with st.sidebar:
+        st.markdown("### 🩺 Latensi per Tahap")
+        if spans:
+            df_spans = pd.DataFrame(spans, columns=['Tahap', 'Model', 'Detik'])
+            df_spans = df_spans.groupby(['Tahap', 'Model'], sort=False)['Detik'].agg(['count', 'sum']).reset_index()
+            df_spans['Waktu (ms)'] = df_spans.pop('sum') * 1e3
+            df_spans = df_spans.rename(columns={'count': 'Jumlah'})
+            st.dataframe(df_spans.style.format({'Waktu (ms)': '{:.3f}'}), use_container_width=True, hide_index=True)
+            st.caption(f"Run terakhir: total {df_spans['Waktu (ms)'].sum():.1f} ms yang terukur")
+        else:
+            st.caption("Belum ada tahap yang terukur pada run ini. Jalankan prediksi untuk melihat rinciannya.")
+
+        ringkasan = timing.default_metrics.summary()
+        if ringkasan:
+            st.markdown("**Kumulatif (semua sesi)**")
+            df_ringkasan = pd.DataFrame(ringkasan).rename(columns={
+                'stage': 'Tahap', 'model': 'Model', 'count': 'Jumlah', 'total_ms': 'Total (ms)', 'mean_ms': 'Rata-rata (ms)'
+            })
+            st.dataframe(df_ringkasan.style.format({'Total (ms)': '{:.1f}', 'Rata-rata (ms)': '{:.3f}'}),
+                         use_container_width=True, hide_index=True)
+            st.download_button(
+                label="📥 Unduh Metrik (Prometheus)",
+                data=timing.default_metrics.prometheus_text().encode('utf-8'),
+                file_name="churn_metrics.prom",
+                mime="text/plain",
+                type="secondary"
+            )
+    timing.default_metrics.stop_trace()
+
 # --- FOOTER (Selaraskan dengan Page 2) ---
 st.markdown("---")
 st.markdown("<center><span style='color: #999;'>© 2025 Kelompok 2 Data Mining</span></center>", unsafe_allow_html=True)